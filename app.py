@@ -1,54 +1,271 @@
 # app.py
+import argparse
+import contextlib
+import json
 import os
-from flask import Flask
+import shutil
+import sys
+import tempfile
+import time
+from flask import Flask, current_app
 from models.country import db
-from models import Country, WmiRegionCode, WmiCountryCode, WmiFactoryCode
+from models import Country, WmiRegionCode, WmiCountryRange, WmiFactoryCode, SeedFingerprint
 from seeders import (
     seed_countries, 
+    load_countries,
     seed_wmi_region_codes, 
     seed_wmi_country_codes, 
     fill_missing_wmi_ranges,
     seed_wmi_factory_codes
 )
-from utils import validate_wmi_country_codes
+from seeders.wmi_region_code_seeder import load_region_code_entries
+from seeders.wmi_country_code_seeder import load_country_code_entries, WMI_COUNTRY_CODES_FILE
+from seeders.wmi_factory_code_seeder import load_factory_entries, WMI_FACTORY_CODES_FILE
+from utils import validate_wmi_codes, print_validation_report, CountryResolver
+from utils.validators import exit_status
+from utils.seed_stamp import write_seed_stamp
+from utils.seed_profile import sqlite_pragmas, StageReport, FAST_SEED_PRAGMAS
+from utils.parallel import run_concurrently
+from utils.progress import log, set_verbosity, get_verbosity, seed_summaries, DEBUG, INFO, ERROR, QUIET
+from seeders.incremental_seeder import (
+    fingerprint_sources,
+    changed_sources,
+    store_fingerprints,
+    apply_seed_diff,
+    print_seed_diff
+)
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///vin.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SEED_BATCH_SIZE'] = None  # rows per commit while seeding; None = one commit per seeder
+app.config['SEED_WORKERS'] = None  # parse worker processes; None = one per CPU
 
 # Initialize db with app
 db.init_app(app)
 
 
-if __name__ == "__main__":
+def seed_settings(fast):
+    """Fast-seed SQLite settings for the current app's engine, or no change"""
+    if fast:
+        log(INFO, "\n⚡ Fast seed profile: " + ', '.join(f"{k}={v}" for k, v in FAST_SEED_PRAGMAS.items()))
+        return sqlite_pragmas(db.engine, FAST_SEED_PRAGMAS)
+    return contextlib.nullcontext()
+
+
+def run_seeders(countries, strict=False, fast=False):
+    """
+    Seed every table of the current app's (empty) database and return the
+    validation report, with the per-stage timings under report['stages']
+    """
+    stages = StageReport()
+    
+    # Parse and expand the code files (no database access) while the countries are written;
+    # the seeders below resolve the parsed entries in memory and are the only writers
+    workers = current_app.config['SEED_WORKERS']
+    region_entries, country_entries, factory_entries = run_concurrently(
+        (load_region_code_entries,),
+        (load_country_code_entries, WMI_COUNTRY_CODES_FILE, workers),
+        (load_factory_entries, WMI_FACTORY_CODES_FILE, workers)
+    )
+    
+    with seed_settings(fast):
+        with stages.stage('seed_countries'):
+            seed_countries(countries)
+        
+        # One country name index shared by the region and country code seeders
+        resolver = CountryResolver.load()
+        with stages.stage('seed_wmi_region_codes'):
+            seed_wmi_region_codes(resolver, region_entries)
+        with stages.stage('seed_wmi_country_codes'):
+            seed_wmi_country_codes(resolver, country_entries)
+        resolver.print_unresolved_summary()
+        
+        # Fill any missing ranges with "Unknown" country
+        with stages.stage('fill_missing_wmi_ranges'):
+            fill_missing_wmi_ranges()
+        
+        # Continue with factory codes
+        with stages.stage('seed_wmi_factory_codes'):
+            seed_wmi_factory_codes(factory_entries)
+        
+        # Validate region, country and factory coverage (never prompts)
+        with stages.stage('validate_wmi_codes'):
+            report = validate_wmi_codes(strict)
+    
+    report['stages'] = stages.stages
+    if get_verbosity() <= INFO:
+        print_validation_report(report)
+        stages.print_report()
+    return report
+
+
+def write_seed_summary(path, report=None, **extra):
+    """Write the seeder summaries (and validation result) as JSON for scripts and CI"""
+    summary = {'seeders': seed_summaries(), **extra}
+    if report is not None:
+        summary['validation'] = {
+            'ok': report['ok'],
+            'errors': report['errors'],
+            'warnings': report['warnings']
+        }
+        summary['stages'] = report['stages']
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    log(INFO, f"📝 Seed summary written to {path}")
+
+
+def full_reseed(refresh_countries=False, strict=False, fast=False, summary_path=None):
+    """Delete the database and seed every table from scratch; returns the exit status"""
     with app.app_context():
+        # Load (or refresh) the countries first, so a failure leaves the old database in place
+        countries, countries_raw = load_countries(refresh_countries)
+        
         # Remove old database
         db_path = './instance/vin.db'
         if os.path.exists(db_path):
             os.remove(db_path)
-            print(f"🗑️  Removed old database: {db_path}")
+            log(INFO, f"🗑️  Removed old database: {db_path}")
         
         # Create all tables
         db.create_all()
-        print("\n✅ Database and tables created successfully.")
-        print("\nTables created:")
-        print("  - countries")
-        print("  - wmi_region_codes")
-        print("  - wmi_country_codes")
-        print("  - wmi_factory_codes")
+        log(INFO, "\n✅ Database and tables created successfully.")
+        log(INFO, "\nTables created:")
+        log(INFO, "  - countries")
+        log(INFO, "  - wmi_region_codes")
+        log(INFO, "  - wmi_country_ranges")
+        log(INFO, "  - wmi_factory_codes")
+        log(INFO, "  - seed_fingerprints")
         
         # Run seeders
-        seed_countries()
-        seed_wmi_region_codes()
-        seed_wmi_country_codes()
+        report = run_seeders(countries, strict, fast)
         
-        # Fill any missing ranges with "Unknown" country
-        fill_missing_wmi_ranges()
+        # Record the sources so an incremental reseed can skip unchanged data
+        store_fingerprints(fingerprint_sources(countries_raw))
+        db.session.commit()
         
-        # Validate WMI country codes after filling gaps
-        validate_wmi_country_codes()
+        # Tell running decoders to drop their cached WMI data
+        write_seed_stamp(os.path.join(app.instance_path, 'vin.db'))
         
-        # Continue with factory codes
-        seed_wmi_factory_codes()
+        if summary_path:
+            write_seed_summary(summary_path, report, mode='full')
+        
+        if not report['ok']:
+            log(ERROR, "\n⚠️  Database seeded, but validation failed: " + '; '.join(
+                report['errors'] + report['warnings']))
+            return exit_status(report)
         
-        print("\n🎉 All done! Database is ready to use.")
\ No newline at end of file
+        log(INFO, "\n🎉 All done! Database is ready to use.")
+        return 0
+
+
+def build_staging_database(countries, staging_dir, strict=False, fast=False):
+    """Seed a throwaway database in staging_dir and return (path, validation report)"""
+    staging_app = Flask(f"{__name__}_staging", instance_path=staging_dir)
+    staging_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(staging_dir, 'vin.db')
+    staging_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    staging_app.config['SEED_BATCH_SIZE'] = app.config['SEED_BATCH_SIZE']
+    staging_app.config['SEED_WORKERS'] = app.config['SEED_WORKERS']
+    db.init_app(staging_app)
+    
+    with staging_app.app_context():
+        db.create_all()
+        report = run_seeders(countries, strict, fast)
+        db.session.remove()
+        db.engine.dispose()
+    return os.path.join(staging_dir, 'vin.db'), report
+
+
+def incremental_reseed(force=False, refresh_countries=False, strict=False, fast=False, summary_path=None):
+    """Apply only the row changes between the seed sources and the live tables; returns the exit status"""
+    started = time.perf_counter()
+    
+    with app.app_context():
+        # Creates the tables (and seed_fingerprints) if missing; existing data is kept
+        db.create_all()
+        
+        countries, countries_raw = load_countries(refresh_countries)
+        fingerprints = fingerprint_sources(countries_raw)
+        changed = changed_sources(fingerprints)
+        
+        if not changed and not force:
+            log(INFO, f"\n✅ Seed sources unchanged, nothing to do ({time.perf_counter() - started:.2f}s)")
+            if summary_path:
+                write_seed_summary(summary_path, mode='incremental', changed_sources=[])
+            return 0
+        
+        log(INFO, f"\n🔄 Changed sources: {', '.join(changed) or 'none (forced)'}")
+        log(INFO, "🏗️  Building staging database...")
+        staging_dir = tempfile.mkdtemp(prefix='vin-seed-')
+        try:
+            staging_path, report = build_staging_database(countries, staging_dir, strict, fast)
+            if not report['ok']:
+                log(ERROR, "\n❌ Staging database failed validation, live database left unchanged: "
+                    + '; '.join(report['errors'] + report['warnings']))
+                if summary_path:
+                    write_seed_summary(summary_path, report, mode='incremental', changed_sources=changed)
+                return exit_status(report)
+            
+            log(INFO, "\n🔀 Applying changes to the live database...")
+            try:
+                summary = apply_seed_diff(staging_path)
+                store_fingerprints(fingerprints)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        
+        print_seed_diff(summary)
+        
+        # Tell running decoders to drop their cached WMI data
+        write_seed_stamp(os.path.join(app.instance_path, 'vin.db'))
+        
+        if summary_path:
+            write_seed_summary(summary_path, report, mode='incremental', changed_sources=changed, diff=summary)
+        
+        log(INFO, f"\n🎉 Incremental reseed done in {time.perf_counter() - started:.2f}s")
+        return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Seed the VIN decoder database')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Apply only changed rows to the existing database (keeps factory_logos)')
+    parser.add_argument('--force', action='store_true',
+                        help='With --incremental, diff the tables even if no source changed')
+    parser.add_argument('--refresh-countries', action='store_true',
+                        help='Download the countries dataset again instead of using json/countries.json')
+    parser.add_argument('--strict', action='store_true',
+                        help='Treat validation warnings as failures')
+    parser.add_argument('--fast', action='store_true',
+                        help='Seed with relaxed SQLite durability (in-memory journal, synchronous off); '
+                             'safe settings are restored afterwards')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Commit every N rows while seeding (default: one commit per seeder)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for parsing and expanding the code files (default: one per CPU, '
+                             '1 = no pool; small files are always parsed in-process)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Print errors only')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Also print one line per seeded row')
+    parser.add_argument('--summary-json', metavar='PATH',
+                        help='Write inserted/updated/skipped counts and errors per seeder to PATH')
+    args = parser.parse_args()
+    
+    app.config['SEED_BATCH_SIZE'] = args.batch_size
+    app.config['SEED_WORKERS'] = args.workers
+    if args.quiet:
+        set_verbosity(QUIET)
+    elif args.verbose:
+        set_verbosity(DEBUG)
+    
+    if args.incremental:
+        status = incremental_reseed(force=args.force, refresh_countries=args.refresh_countries,
+                                    strict=args.strict, fast=args.fast, summary_path=args.summary_json)
+    else:
+        status = full_reseed(refresh_countries=args.refresh_countries, strict=args.strict, fast=args.fast,
+                             summary_path=args.summary_json)
+    sys.exit(status)
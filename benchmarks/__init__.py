@@ -0,0 +1,16 @@
+"""
+Performance benchmarks for the VIN decoder, generator, seeders and logo matcher
+Run against a locally seeded instance/vin.db:
+    python -m benchmarks -o before.json
+    python -m benchmarks -o after.json --compare before.json
+"""
+from .harness import measure, measure_once, compare_results
+from .runner import run_benchmarks, BENCHMARK_GROUPS
+
+__all__ = [
+    'measure',
+    'measure_once',
+    'compare_results',
+    'run_benchmarks',
+    'BENCHMARK_GROUPS'
+]
@@ -0,0 +1,75 @@
+"""Command-line entry point: python -m benchmarks"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from .harness import compare_results
+from .runner import run_benchmarks, BENCHMARK_GROUPS, ROOT_DIR
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(results):
+    print("\n" + "=" * 90)
+    print(f"{'benchmark':46} {'ops/s':>12} {'p50 µs':>10} {'p99 µs':>10} {'total s':>8}")
+    print("-" * 90)
+    for name, result in results.items():
+        if 'ops_per_second' not in result:
+            continue
+        latency = result['latency_us']
+        print(f"{name[:46]:46} {result['ops_per_second']:>12,.0f} {latency['p50']:>10.1f} "
+              f"{latency['p99']:>10.1f} {result['total_seconds']:>8.3f}")
+    print("=" * 90)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmark the VIN decoder against instance/vin.db')
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help='JSON results file (default: benchmark_results.json)')
+    parser.add_argument('-g', '--group', action='append', choices=list(BENCHMARK_GROUPS),
+                        help='Benchmark group to run (repeatable, default: all)')
+    parser.add_argument('-n', '--iterations', type=int, default=2000,
+                        help='Calls per per-call benchmark (default: 2000)')
+    parser.add_argument('--compare', metavar='BASELINE_JSON',
+                        help='Print throughput ratios against an earlier results file')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.group, max(args.iterations, 100))
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'groups': args.group or list(BENCHMARK_GROUPS)
+        },
+        'results': results
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print_summary(results)
+    print(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n📊 Throughput vs {args.compare} (>1.00 is faster):")
+        for name, ratio in compare_results(baseline, report).items():
+            print(f"  {name[:60]:60} {ratio:6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Timing helpers shared by the benchmark groups
+"""
+import time
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns, total_ns, operations):
+    """Throughput and latency percentiles (in microseconds) for a run"""
+    latencies = sorted(latencies_ns)
+    to_us = 1e-3
+    return {
+        'operations': operations,
+        'total_seconds': total_ns / 1e9,
+        'ops_per_second': operations / (total_ns / 1e9) if total_ns else 0.0,
+        'latency_us': {
+            'min': latencies[0] * to_us if latencies else 0.0,
+            'mean': sum(latencies) / len(latencies) * to_us if latencies else 0.0,
+            'p50': percentile(latencies, 0.50) * to_us,
+            'p90': percentile(latencies, 0.90) * to_us,
+            'p99': percentile(latencies, 0.99) * to_us,
+            'max': latencies[-1] * to_us if latencies else 0.0
+        }
+    }
+
+
+def measure(func, inputs, warmup=10, ops_per_call=1):
+    """
+    Call func once per input, timing every call.
+    ops_per_call scales throughput for calls that handle a batch.
+    """
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        func(item)
+
+    latencies = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for item in inputs:
+        t0 = clock()
+        func(item)
+        latencies.append(clock() - t0)
+    total = clock() - start
+
+    result = summarize(latencies, total, len(inputs) * ops_per_call)
+    if ops_per_call != 1:
+        result['calls'] = len(inputs)
+        result['ops_per_call'] = ops_per_call
+    return result
+
+
+def measure_once(func, operations=1):
+    """Time a single long-running call (a seeder, a full matching pass)"""
+    start = time.perf_counter_ns()
+    value = func()
+    total = time.perf_counter_ns() - start
+    result = summarize([total], total, operations)
+    return result, value
+
+
+def compare_results(baseline, current):
+    """Throughput ratio (current / baseline) for every benchmark present in both runs"""
+    ratios = {}
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before or 'ops_per_second' not in before or 'ops_per_second' not in result:
+            continue
+        if before['ops_per_second']:
+            ratios[name] = result['ops_per_second'] / before['ops_per_second']
+    return ratios
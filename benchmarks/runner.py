@@ -0,0 +1,245 @@
+"""
+Benchmark groups for decode, check digits, generation, endpoints, seeding and logo matching
+All groups run against the locally seeded instance/vin.db.
+"""
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+
+from flask import Flask
+
+import vin_app
+from vin_app import app, db, db_path
+
+# Repository root (the seeders read ./json/*.json relative to it)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@contextlib.contextmanager
+def decoder_config(preload=True, decode_cache=0, wmi_cache=0):
+    """Temporarily switch decoder mode and cache sizes, starting from cold caches"""
+    saved = (app.config['WMI_PRELOAD'], vin_app.decode_cache.maxsize, vin_app.wmi_cache.maxsize)
+    app.config['WMI_PRELOAD'] = preload
+    vin_app.decode_cache.maxsize = decode_cache
+    vin_app.wmi_cache.maxsize = wmi_cache
+    vin_app.invalidate_caches()
+    try:
+        yield
+    finally:
+        app.config['WMI_PRELOAD'], vin_app.decode_cache.maxsize, vin_app.wmi_cache.maxsize = saved
+        vin_app.invalidate_caches()
+
+
+def sample_vins(count, seed=1):
+    """Valid VINs with real WMIs, plus some with unknown ones"""
+    with app.app_context(), decoder_config():
+        vins = list(vin_app.generate_vins(count, seed=seed))
+    rng = random.Random(seed)
+    for i in range(0, count, 10):
+        vins[i] = ''.join(rng.choices(vin_app.VIN_CHARACTERS, k=17))
+    return vins
+
+
+def bench_decode(measure, iterations):
+    vins = sample_vins(iterations)
+    results = {}
+
+    with app.app_context():
+        with decoder_config(preload=True):
+            vin_app.get_wmi_lookup()
+            results['decode_vin.preload'] = measure(vin_app.decode_vin, vins)
+
+        with decoder_config(preload=False):
+            results['decode_vin.db'] = measure(vin_app.decode_vin, vins)
+
+        with decoder_config(preload=False, decode_cache=len(vins)):
+            for vin in vins:
+                vin_app.decode_vin(vin)
+            results['decode_vin.cached'] = measure(vin_app.decode_vin, vins)
+
+        batches = [vins[i:i + 100] for i in range(0, len(vins), 100)]
+        with decoder_config(preload=False):
+            results['decode_vins.db_batch100'] = measure(vin_app.decode_vins, batches, warmup=1,
+                                                         ops_per_call=100)
+
+    snapshot_path = os.path.join(os.path.dirname(db_path), 'wmi.snapshot')
+    if os.path.exists(snapshot_path):
+        from utils.wmi_snapshot import WmiSnapshot
+        snapshot = WmiSnapshot(snapshot_path)
+        results['decode_vin.snapshot'] = measure(lambda vin: vin_app.decode_vin(vin, snapshot), vins)
+        snapshot.close()
+
+    return results
+
+
+def bench_check_digit(measure, iterations):
+    vins = sample_vins(iterations)
+    results = {
+        'compute_check_digit': measure(vin_app.compute_check_digit, vins),
+        'validate_check_digit': measure(vin_app.validate_check_digit, vins)
+    }
+    batch_size = min(len(vins), 1000)
+    batches = [vins[:batch_size]] * max(1, iterations // batch_size)
+    results['compute_check_digits.batch'] = measure(vin_app.compute_check_digits, batches, warmup=1,
+                                                    ops_per_call=batch_size)
+    results['compute_check_digits.batch']['numpy'] = vin_app.np is not None
+    return results
+
+
+def bench_generate(measure, iterations):
+    results = {}
+    with app.app_context():
+        for preload in (True, False):
+            mode = 'preload' if preload else 'db'
+            with decoder_config(preload=preload):
+                results[f'generate_vin.{mode}'] = measure(lambda _: vin_app.generate_vin(), range(iterations))
+                results[f'generate_vins.{mode}_x1000'] = measure(
+                    lambda _: list(vin_app.generate_vins(1000)), range(max(1, iterations // 1000)),
+                    warmup=1, ops_per_call=1000
+                )
+    return results
+
+
+def bench_endpoints(measure, iterations):
+    vins = sample_vins(iterations)
+    client = app.test_client()
+    batches = [vins[i:i + 100] for i in range(0, len(vins), 100)]
+    results = {}
+
+    for preload in (True, False):
+        mode = 'preload' if preload else 'db'
+        with decoder_config(preload=preload, decode_cache=vin_app.app.config['DECODE_CACHE_SIZE']):
+            results[f'POST /api/decode.{mode}'] = measure(
+                lambda vin: client.post('/api/decode', json={'vin': vin}), vins)
+            results[f'POST /api/decode/batch.{mode}_x100'] = measure(
+                lambda batch: client.post('/api/decode/batch', json={'vins': batch}), batches,
+                warmup=1, ops_per_call=100)
+            results[f'POST /api/generate.{mode}'] = measure(
+                lambda _: client.post('/api/generate'), range(max(1, iterations // 4)))
+            results[f'POST /api/generate.{mode}_x100'] = measure(
+                lambda _: client.post('/api/generate', json={'count': 100}), range(max(1, iterations // 100)),
+                warmup=1, ops_per_call=100)
+    return results
+
+
+def copy_countries(source_path, target_engine):
+    """Copy the countries table from the seeded database (for hosts without network)"""
+    source = sqlite3.connect(source_path)
+    rows = source.execute("SELECT * FROM countries").fetchall()
+    columns = [d[0] for d in source.execute("SELECT * FROM countries LIMIT 1").description]
+    source.close()
+
+    placeholders = ', '.join('?' for _ in columns)
+    with target_engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"INSERT INTO countries ({', '.join(columns)}) VALUES ({placeholders})", rows
+        )
+    return len(rows)
+
+
+def bench_seeding(measure_once_func, iterations):
+    """Time each seeder in seeders.__all__, in order, against a fresh temporary database"""
+    import seeders
+    from models.country import Country
+
+    results = {}
+    tmp_dir = tempfile.mkdtemp(prefix='vin-bench-')
+    seed_app = Flask('vin_bench_seed', instance_path=tmp_dir)
+    seed_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp_dir, 'vin.db')
+    seed_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(seed_app)
+
+    cwd = os.getcwd()
+    os.chdir(ROOT_DIR)
+    try:
+        with seed_app.app_context():
+            db.create_all()
+            for name in seeders.__all__:
+                seeder = getattr(seeders, name)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result, _ = measure_once_func(seeder)
+                results[f'seed.{name}'] = result
+
+                if name == 'seed_countries' and Country.query.count() == 0:
+                    # Offline: fall back to the countries of the seeded database
+                    copied = copy_countries(db_path, db.engine)
+                    result['note'] = f'download failed, copied {copied} countries from {db_path}'
+
+            for table in ('countries', 'wmi_region_codes', 'wmi_country_ranges', 'wmi_factory_codes'):
+                count = db.session.execute(db.text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                results.setdefault('seed.row_counts', {})[table] = count
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return results
+
+
+def bench_logos(measure_once_func, iterations):
+    """Time match_logos.find_matches and resolve_conflicts over the seeded factories"""
+    try:
+        import match_logos
+    except ImportError as e:
+        return {'find_matches': {'skipped': f'match_logos unavailable: {e}'}}
+
+    conn = sqlite3.connect(db_path)
+    factories = match_logos.get_all_factories(conn.cursor())
+    conn.close()
+
+    logos = match_logos.get_logo_files() if os.path.exists(match_logos.LOGOS_DIR) else []
+    source = 'logos_dir'
+    if not logos:
+        # No scraped logos here: use the leading word of each manufacturer as a brand
+        source = 'synthetic'
+        brands = sorted({f['name'].split()[0] for f in factories if f['name'].split()})
+        logos = [{
+            'filename': f"{brand.lower()}.png",
+            'brand_name': brand,
+            'normalized': match_logos.normalize_name(brand)
+        } for brand in brands]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        matches_result, matches = measure_once_func(lambda: match_logos.find_matches(logos, factories),
+                                                    operations=len(logos) * len(factories))
+        conflicts_result, _ = measure_once_func(lambda: match_logos.resolve_conflicts(matches))
+
+    matches_result.update({'logos': len(logos), 'factories': len(factories), 'logo_source': source,
+                           'logos_with_matches': len(matches)})
+    return {
+        'find_matches': matches_result,
+        'resolve_conflicts': conflicts_result
+    }
+
+
+# Group name -> (function, timing style)
+BENCHMARK_GROUPS = {
+    'decode': (bench_decode, 'per_call'),
+    'check_digit': (bench_check_digit, 'per_call'),
+    'generate': (bench_generate, 'per_call'),
+    'endpoints': (bench_endpoints, 'per_call'),
+    'seeding': (bench_seeding, 'once'),
+    'logos': (bench_logos, 'once'),
+}
+
+
+def run_benchmarks(groups=None, iterations=2000):
+    """Run the selected benchmark groups and return {benchmark name: result}"""
+    from .harness import measure, measure_once
+
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Seeded database not found at {db_path}; run app.py first")
+
+    results = {}
+    for name in groups or BENCHMARK_GROUPS:
+        func, style = BENCHMARK_GROUPS[name]
+        timer = measure if style == 'per_call' else measure_once
+        print(f"⏱️  Running {name} benchmarks...")
+        for bench_name, result in func(timer, iterations).items():
+            results[f"{name}/{bench_name}"] = result
+    return results
@@ -0,0 +1,42 @@
+"""Compile the seeded WMI tables into a memory-mappable snapshot
+Run after app.py (and match_logos.py) so decoders can start without the database:
+    python build_wmi_snapshot.py
+    VIN_WMI_SNAPSHOT=instance/wmi.snapshot python vin_app.py
+"""
+import argparse
+import os
+import time
+
+from vin_app import app, db_path
+from utils.wmi_lookup import load_wmi_lookup
+from utils.wmi_snapshot import compile_wmi_snapshot, WmiSnapshot
+from utils.seed_stamp import write_seed_stamp
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(db_path), 'wmi.snapshot')
+
+
+def build_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """Load every WMI table from the database and write the snapshot file"""
+    start = time.perf_counter()
+    with app.app_context():
+        lookup = load_wmi_lookup()
+    size = compile_wmi_snapshot(lookup, path)
+    elapsed = time.perf_counter() - start
+
+    # Re-open to verify the checksum and layout before decoders pick it up
+    snapshot = WmiSnapshot(path)
+    print(f"✅ Wrote {size:,} bytes to {path} in {elapsed:.2f}s")
+    print(f"   {snapshot}")
+    snapshot.close()
+
+    # Tell running decoders to reload
+    write_seed_stamp(db_path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compile the WMI tables into a binary snapshot')
+    parser.add_argument('-o', '--output', default=DEFAULT_SNAPSHOT_PATH,
+                        help=f'Snapshot path (default: {DEFAULT_SNAPSHOT_PATH})')
+    args = parser.parse_args()
+    build_snapshot(args.output)
@@ -0,0 +1,240 @@
+"""Bulk VIN decoder
+Streams VINs from a CSV or NDJSON file (or stdin) through decode_vin and
+writes the decoded records incrementally as CSV or NDJSON.
+
+Examples:
+    python bulk_decode.py vins.csv -o decoded.ndjson
+    python bulk_decode.py vins.ndjson --workers 4 --unordered -o decoded.csv
+    python bulk_decode.py vins.csv --workers 8 --snapshot instance/wmi.snapshot
+    cat vins.csv | python bulk_decode.py - --input-format csv > decoded.ndjson
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from vin_app import app, decode_vin
+from utils.wmi_lookup import load_wmi_lookup
+from utils.wmi_snapshot import WmiSnapshot
+
+# Columns written in CSV output, in order
+CSV_FIELDS = [
+    'input', 'error', 'vin', 'wmi', 'vds', 'vis', 'check_digit', 'check_digit_valid',
+    'model_year_char', 'model_year', 'plant_code', 'serial_number',
+    'region', 'region_country', 'region_flag',
+    'country', 'country_flag', 'country_region',
+    'manufacturer', 'factory_country', 'factory_flag', 'manufacturer_logos'
+]
+
+FORMATS_BY_EXTENSION = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson'
+}
+
+# WMI lookup tables of the current process (one read-only copy per worker)
+_lookup = None
+
+
+def load_lookup(snapshot_path=None):
+    """Load this process's copy of the WMI lookup tables, or map a snapshot"""
+    global _lookup
+    if snapshot_path:
+        _lookup = WmiSnapshot(snapshot_path)
+        return
+    with app.app_context():
+        _lookup = load_wmi_lookup()
+
+
+def decode_chunk(vins):
+    """
+    Decode a chunk of raw VIN strings with this process's lookup tables.
+    Error records from read_vins (dicts) are passed through as they are.
+    """
+    records = []
+    for raw in vins:
+        if isinstance(raw, dict):
+            records.append(raw)
+            continue
+        record = {'input': raw}
+        record.update(decode_vin(raw, _lookup))
+        records.append(record)
+    return records
+
+
+def detect_format(path, explicit, default):
+    """Pick a file format from the --*-format flag or the file extension"""
+    if explicit:
+        return explicit
+    extension = os.path.splitext(path)[1].lower() if path != '-' else ''
+    return FORMATS_BY_EXTENSION.get(extension, default)
+
+
+def read_vins(stream, input_format, column):
+    """
+    Yield raw VIN strings one at a time from a CSV or NDJSON stream.
+    An NDJSON line that is not valid JSON yields an error record (a dict)
+    naming the line, and reading continues.
+    """
+    if input_format == 'csv':
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        normalized = [name.strip().lower() for name in header]
+        if column.lower() in normalized:
+            index = normalized.index(column.lower())
+        else:
+            # Headerless file: the first row is already a VIN
+            index = 0
+            if header:
+                yield header[0]
+        for row in reader:
+            if len(row) > index:
+                yield row[index]
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield {'input': line, 'error': f'Line {line_number}: invalid JSON ({e.msg})'}
+                continue
+            if isinstance(item, dict):
+                item = item.get(column, '')
+            yield '' if item is None else str(item)
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class RecordWriter:
+    """Write decoded records incrementally as CSV or NDJSON"""
+
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        self.csv_writer = None
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            self.csv_writer.writeheader()
+
+    def write(self, records):
+        for record in records:
+            if self.csv_writer:
+                row = dict(record)
+                row['manufacturer_logos'] = ';'.join(record.get('manufacturer_logos', []))
+                self.csv_writer.writerow(row)
+            else:
+                self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+
+def collect(pending, ordered):
+    """Remove finished work from the pending queue and return its results"""
+    if ordered:
+        return [pending.popleft().result()]
+
+    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+    results = []
+    for future in list(pending):
+        if future in finished:
+            pending.remove(future)
+            results.append(future.result())
+    return results
+
+
+def decode_stream(vins, writer, workers=1, chunk_size=1000, ordered=True, snapshot_path=None):
+    """
+    Decode VINs chunk by chunk and hand each result chunk to the writer.
+    With several workers at most two chunks per worker are in flight,
+    so memory stays bounded regardless of input size.
+    Returns the number of records written.
+    """
+    count = 0
+    chunks = chunked(vins, chunk_size)
+
+    if workers <= 1:
+        load_lookup(snapshot_path)
+        for chunk in chunks:
+            records = decode_chunk(chunk)
+            writer.write(records)
+            count += len(records)
+        return count
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_lookup,
+                             initargs=(snapshot_path,)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(decode_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                for records in collect(pending, ordered):
+                    writer.write(records)
+                    count += len(records)
+
+        while pending:
+            for records in collect(pending, ordered):
+                writer.write(records)
+                count += len(records)
+
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Decode VINs in bulk from a CSV or NDJSON file')
+    parser.add_argument('input', help="Input file, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="Output file, or '-' for stdout (default)")
+    parser.add_argument('--input-format', choices=['csv', 'ndjson'],
+                        help='Input format (default: from extension, else csv)')
+    parser.add_argument('--output-format', choices=['csv', 'ndjson'],
+                        help='Output format (default: from extension, else ndjson)')
+    parser.add_argument('--column', default='vin',
+                        help="CSV column or NDJSON key holding the VIN (default: 'vin')")
+    parser.add_argument('--workers', type=int, default=1, help='Number of decoder processes (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='VINs per work unit (default: 1000)')
+    parser.add_argument('--snapshot',
+                        help='Map this WMI snapshot (build_wmi_snapshot.py) instead of reading the database')
+    parser.add_argument('--unordered', action='store_true',
+                        help='Write chunks as soon as they finish instead of in input order')
+    args = parser.parse_args(argv)
+
+    input_format = detect_format(args.input, args.input_format, 'csv')
+    output_format = detect_format(args.output, args.output_format, 'ndjson')
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+
+    start = time.perf_counter()
+    try:
+        writer = RecordWriter(output_stream, output_format)
+        vins = read_vins(input_stream, input_format, args.column)
+        count = decode_stream(vins, writer, workers=args.workers, chunk_size=max(args.chunk_size, 1),
+                              ordered=not args.unordered, snapshot_path=args.snapshot)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"✅ Decoded {count} VINs in {elapsed:.2f}s ({rate:,.0f} VINs/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,35 @@
+import argparse
 import sqlite3
 import os
+import hashlib
+import json
 from PIL import Image
 from pathlib import Path
 import re
-import shutil
+from utils.seed_stamp import write_seed_stamp
+from utils.parallel import parallel_map
 
 DB_PATH = "./instance/vin.db"
 LOGOS_DIR = "./logos/brands"
 OUTPUT_DIR = "./img/logos"
 THUMBNAIL_HEIGHT = 100  # Height in pixels, width will be calculated to maintain aspect ratio
+THUMBNAIL_MANIFEST = os.path.join(OUTPUT_DIR, "manifest.json")  # logo -> published (content-hashed) thumbnail files
+THUMBNAIL_WORKERS = None  # Processes for thumbnail generation; None = one per CPU
+THUMBNAIL_SCALES = (1,)  # Pixel densities to write, e.g. (1, 2) adds name@2x.png at twice the height
+THUMBNAIL_WEBP = False  # Also write a .webp next to every .png
+SPRITE_SIZE = 0  # Pack this many of the most-used logos into one sprite sheet (0 = no sprite)
+HASH_LENGTH = 12  # Hex digits of the content hash in published filenames
 
 def setup_database():
-    """Drop and recreate the factory_logos table"""
+    """
+    Create the factory_logos table and the match state tables if missing.
+    Existing rows are kept; main() replaces them with a diff in one transaction.
+    """
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
-    # Drop existing table
-    cursor.execute("DROP TABLE IF EXISTS factory_logos")
-    
-    # Create factory_logos table fresh
     cursor.execute("""
-        CREATE TABLE factory_logos (
+        CREATE TABLE IF NOT EXISTS factory_logos (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             factory_id INTEGER NOT NULL,
             logo_filename VARCHAR(255) NOT NULL,
@@ -29,6 +38,27 @@ def setup_database():
         )
     """)
     
+    # What the last run matched against, so --incremental only rematches what changed
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS logo_match_factories (
+            factory_id INTEGER PRIMARY KEY,
+            manufacturer VARCHAR(255) NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS logo_match_logos (
+            logo_filename VARCHAR(255) PRIMARY KEY
+        )
+    """)
+    # Every whole-word match before conflict resolution
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS logo_matches (
+            logo_filename VARCHAR(255) NOT NULL,
+            factory_id INTEGER NOT NULL,
+            PRIMARY KEY(logo_filename, factory_id)
+        )
+    """)
+    
     conn.commit()
     return conn
 
@@ -50,7 +80,8 @@ def get_logo_files():
         return []
     
     logo_files = []
-    for file in os.listdir(LOGOS_DIR):
+    # Sorted, so conflict resolution ties break the same way on every run
+    for file in sorted(os.listdir(LOGOS_DIR)):
         if file.endswith('.png'):
             # Extract brand name from filename (remove .png extension and replace underscores)
             brand_name = file[:-4].replace('_', ' ')
@@ -64,7 +95,7 @@ def get_logo_files():
 
 def get_all_factories(cursor):
     """Get all factories from the database"""
-    cursor.execute("SELECT id, manufacturer FROM wmi_factory_codes")
+    cursor.execute("SELECT id, manufacturer FROM wmi_factory_codes ORDER BY id")
     factories = []
     for row in cursor.fetchall():
         factory_id, manufacturer = row
@@ -75,36 +106,176 @@ def get_all_factories(cursor):
         })
     return factories
 
-def find_matches(logos, factories):
-    """Find matches between logos and factories"""
-    matches = []
-    
-    for logo in logos:
-        logo_matches = []
+def build_token_index(logos):
+    """
+    Index logos by the first word of their normalized brand name.
+    Normalized names are single-space separated [a-z0-9] words, so a whole-word
+    (\\b...\\b) match is exactly a run of consecutive words in the factory name.
+    """
+    index = {}
+    for position, logo in enumerate(logos):
         logo_normalized = logo['normalized']
         
         # Skip very short brand names (2 chars or less) to avoid false positives
         if len(logo_normalized) <= 2:
             continue
         
-        for factory in factories:
-            factory_normalized = factory['normalized']
-            
-            # Check if logo brand name appears as a whole word in factory name
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(logo_normalized) + r'\b'
-            if re.search(pattern, factory_normalized):
-                logo_matches.append(factory['id'])
+        tokens = logo_normalized.split()
+        index.setdefault(tokens[0], []).append((position, tokens))
+    return index
+
+def find_matches(logos, factories):
+    """Find matches between logos and factories (one pass over each factory name's words)"""
+    index = build_token_index(logos)
+    logo_matches = {}
+    
+    for factory in factories:
+        factory_tokens = factory['normalized'].split()
+        matched = set()
         
-        if logo_matches:
+        # Check every brand starting at each word; a brand matches as a whole-word run
+        for start, token in enumerate(factory_tokens):
+            for position, tokens in index.get(token, ()):
+                if position not in matched and factory_tokens[start:start + len(tokens)] == tokens:
+                    matched.add(position)
+        
+        for position in matched:
+            logo_matches.setdefault(position, []).append(factory['id'])
+    
+    # Same order as the logos list, factory ids in factory order
+    matches = []
+    for position in sorted(logo_matches):
+        factory_ids = logo_matches[position]
+        matches.append({
+            'logo': logos[position],
+            'factory_ids': factory_ids,
+            'match_count': len(factory_ids)
+        })
+    
+    return matches
+
+def match_pairs(matches):
+    """(logo_filename, factory_id) pairs of a find_matches result"""
+    return {
+        (match['logo']['filename'], factory_id)
+        for match in matches
+        for factory_id in match['factory_ids']
+    }
+
+def matches_from_pairs(logos, pairs):
+    """Rebuild a find_matches result (same order) from (logo_filename, factory_id) pairs"""
+    factory_ids_by_logo = {}
+    for logo_filename, factory_id in pairs:
+        factory_ids_by_logo.setdefault(logo_filename, []).append(factory_id)
+    
+    matches = []
+    for logo in logos:
+        factory_ids = factory_ids_by_logo.get(logo['filename'])
+        if factory_ids:
+            factory_ids.sort()
             matches.append({
                 'logo': logo,
-                'factory_ids': logo_matches,
-                'match_count': len(logo_matches)
+                'factory_ids': factory_ids,
+                'match_count': len(factory_ids)
             })
-    
     return matches
 
+def load_match_state(cursor):
+    """(factory_id -> manufacturer, logo filenames, match pairs) recorded by the last run"""
+    cursor.execute("SELECT factory_id, manufacturer FROM logo_match_factories")
+    known_factories = dict(cursor.fetchall())
+    cursor.execute("SELECT logo_filename FROM logo_match_logos")
+    known_logos = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT logo_filename, factory_id FROM logo_matches")
+    pairs = set(cursor.fetchall())
+    return known_factories, known_logos, pairs
+
+def incremental_match_pairs(logos, factories, state):
+    """
+    Update the recorded match pairs for what changed since the last run:
+    factories whose manufacturer changed (or that are new) are matched against
+    every logo, new logo files against the unchanged factories, and pairs of
+    removed logos and factories are dropped. Returns (pairs, changed factories,
+    added logos, removed logos).
+    """
+    known_factories, known_logos, pairs = state
+    
+    logo_filenames = {logo['filename'] for logo in logos}
+    factory_ids = {factory['id'] for factory in factories}
+    changed_factories = [f for f in factories if known_factories.get(f['id']) != f['name']]
+    changed_ids = {factory['id'] for factory in changed_factories}
+    added_logos = [logo for logo in logos if logo['filename'] not in known_logos]
+    removed_logos = known_logos - logo_filenames
+    
+    new_pairs = {
+        (logo_filename, factory_id) for logo_filename, factory_id in pairs
+        if logo_filename in logo_filenames and factory_id in factory_ids and factory_id not in changed_ids
+    }
+    new_pairs |= match_pairs(find_matches(logos, changed_factories))
+    unchanged_factories = [f for f in factories if f['id'] not in changed_ids]
+    new_pairs |= match_pairs(find_matches(added_logos, unchanged_factories))
+    
+    return new_pairs, changed_factories, added_logos, removed_logos
+
+def save_match_state(cursor, logos, factories, pairs, state):
+    """Write only the differences between the recorded and the current match state"""
+    known_factories, known_logos, old_pairs = state
+    
+    current_factories = {factory['id']: factory['name'] for factory in factories}
+    cursor.executemany(
+        "DELETE FROM logo_match_factories WHERE factory_id = ?",
+        [(factory_id,) for factory_id in known_factories if factory_id not in current_factories]
+    )
+    cursor.executemany(
+        "INSERT OR REPLACE INTO logo_match_factories (factory_id, manufacturer) VALUES (?, ?)",
+        [item for item in current_factories.items() if known_factories.get(item[0]) != item[1]]
+    )
+    
+    logo_filenames = {logo['filename'] for logo in logos}
+    cursor.executemany(
+        "DELETE FROM logo_match_logos WHERE logo_filename = ?",
+        [(logo_filename,) for logo_filename in known_logos - logo_filenames]
+    )
+    cursor.executemany(
+        "INSERT INTO logo_match_logos (logo_filename) VALUES (?)",
+        [(logo_filename,) for logo_filename in logo_filenames - known_logos]
+    )
+    
+    cursor.executemany(
+        "DELETE FROM logo_matches WHERE logo_filename = ? AND factory_id = ?",
+        sorted(old_pairs - pairs)
+    )
+    cursor.executemany(
+        "INSERT INTO logo_matches (logo_filename, factory_id) VALUES (?, ?)",
+        sorted(pairs - old_pairs)
+    )
+
+def apply_logo_diff(cursor, final_mappings, published):
+    """
+    Make factory_logos hold exactly final_mappings, stored under each logo's
+    published thumbnail name (logos without a thumbnail are left out), by
+    deleting and inserting only the rows that differ. Returns (inserted, deleted) counts.
+    """
+    cursor.execute("SELECT factory_id, logo_filename FROM factory_logos")
+    existing = set(cursor.fetchall())
+    wanted = {
+        (factory_id, published[logo['filename']])
+        for factory_id, logo in final_mappings.items()
+        if logo['filename'] in published
+    }
+    
+    stale = sorted(existing - wanted)
+    missing = sorted(wanted - existing)
+    cursor.executemany(
+        "DELETE FROM factory_logos WHERE factory_id = ? AND logo_filename = ?",
+        stale
+    )
+    cursor.executemany(
+        "INSERT INTO factory_logos (factory_id, logo_filename) VALUES (?, ?)",
+        missing
+    )
+    return len(missing), len(stale)
+
 def resolve_conflicts(matches):
     """Resolve conflicts where multiple logos match the same factory"""
     # Create a mapping of factory_id -> list of logos that match it
@@ -134,46 +305,228 @@ def resolve_conflicts(matches):
     
     return final_mappings
 
-def create_thumbnail(source_path, dest_path):
-    """Create a thumbnail of the logo, keeping PNG format for transparency"""
+def create_thumbnail(source_path, outputs):
+    """
+    Create thumbnails of the logo for each (dest_path, height) in outputs.
+    .png keeps transparency; .webp is written as a smaller alternative.
+    """
     try:
         with Image.open(source_path) as img:
-            # Calculate new width maintaining aspect ratio
+            # Calculate widths maintaining aspect ratio
             aspect_ratio = img.width / img.height
-            new_height = THUMBNAIL_HEIGHT
-            new_width = int(new_height * aspect_ratio)
+            largest = max(height for _, height in outputs)
             
-            # Resize image
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # Let JPEG sources decode at a reduced scale (no-op for other formats)
+            img.draft(None, (int(largest * aspect_ratio), largest))
+            img.load()
             
-            # Save as PNG to preserve transparency
-            img.save(dest_path, 'PNG', optimize=True)
+            for dest_path, new_height in outputs:
+                new_width = max(1, int(new_height * aspect_ratio))
+                
+                # Resize image; large sources are first shrunk with a cheap integer reduce()
+                thumb = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+                
+                # Write beside the target and rename, so readers never see half a file
+                tmp_path = dest_path + '.tmp'
+                if dest_path.endswith('.webp'):
+                    thumb.save(tmp_path, 'WEBP', quality=90, method=6)
+                else:
+                    thumb.save(tmp_path, 'PNG', optimize=True)
+                os.replace(tmp_path, dest_path)
         
         return True
     except Exception as e:
         print(f"Error creating thumbnail for {source_path}: {e}")
         return False
 
-def main():
+def thumbnail_key(source_path):
+    """Hash of the source file and THUMBNAIL_HEIGHT; a thumbnail is rebuilt only when this changes"""
+    digest = hashlib.sha256(f"{THUMBNAIL_HEIGHT}:".encode())
+    with open(source_path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+def thumbnail_files(logo_filename, key, scales=THUMBNAIL_SCALES, webp=THUMBNAIL_WEBP):
+    """
+    Published filenames of one logo's thumbnails, e.g. {'1x': 'ford.3fa9c1d2e4b7.png',
+    '2x': 'ford.3fa9c1d2e4b7@2x.png', '1x.webp': 'ford.3fa9c1d2e4b7.webp'}.
+    The content hash in the name lets browsers cache them forever.
+    """
+    stem = f"{os.path.splitext(logo_filename)[0]}.{key[:HASH_LENGTH]}"
+    files = {}
+    for scale in sorted({1, *scales}):
+        suffix = '' if scale == 1 else f'@{scale}x'
+        files[f'{scale}x'] = f"{stem}{suffix}.png"
+        if webp:
+            files[f'{scale}x.webp'] = f"{stem}{suffix}.webp"
+    return files
+
+def variant_height(variant):
+    """Pixel height of a thumbnail_files variant such as '2x' or '1x.webp'"""
+    return THUMBNAIL_HEIGHT * int(variant.split('x')[0])
+
+def load_thumbnail_manifest():
+    """{'logos': {logo filename: entry}, 'sprite': entry or None} as written by the last run"""
+    try:
+        with open(THUMBNAIL_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault('logos', {})
+    manifest.setdefault('sprite', None)
+    manifest.setdefault('stale', [])
+    return manifest
+
+def save_thumbnail_manifest(manifest):
+    tmp_path = THUMBNAIL_MANIFEST + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, THUMBNAIL_MANIFEST)
+
+def build_thumbnail(job):
+    """Worker entry point: (source_path, [(dest_path, height)]) -> created?"""
+    source_path, outputs = job
+    return create_thumbnail(source_path, outputs)
+
+def update_thumbnails(logo_filenames, scales=THUMBNAIL_SCALES, webp=THUMBNAIL_WEBP):
+    """
+    Build missing or outdated thumbnails for logo_filenames in a process pool
+    and skip unchanged ones. Files they replace are only marked stale (see
+    remove_unused_thumbnails), since the database still points at them.
+    Returns (created, up-to-date, {logo filename: published 1x filename}).
+    """
+    manifest = load_thumbnail_manifest()
+    logos = manifest['logos']
+    jobs = []
+    up_to_date = []
+    
+    for logo_filename in logo_filenames:
+        source_path = os.path.join(LOGOS_DIR, logo_filename)
+        try:
+            key = thumbnail_key(source_path)
+        except OSError as e:
+            print(f"Error creating thumbnail for {source_path}: {e}")
+            continue
+        
+        files = thumbnail_files(logo_filename, key, scales, webp)
+        entry = logos.get(logo_filename)
+        if (entry and entry.get('key') == key
+                and all(os.path.exists(os.path.join(OUTPUT_DIR, name)) for name in files.values())):
+            # Variants no longer requested (e.g. WebP switched off) are dropped with the stale files
+            manifest['stale'].extend(name for name in entry['files'].values() if name not in files.values())
+            entry['files'] = files
+            up_to_date.append(logo_filename)
+        else:
+            outputs = [(os.path.join(OUTPUT_DIR, name), variant_height(variant))
+                       for variant, name in files.items()]
+            jobs.append((logo_filename, key, files, (source_path, outputs)))
+    
+    results = parallel_map(build_thumbnail, [job for *_, job in jobs], THUMBNAIL_WORKERS, min_items=8)
+    
+    created = []
+    for (logo_filename, key, files, _), ok in zip(jobs, results):
+        if not ok:
+            continue
+        old_entry = logos.get(logo_filename)
+        if old_entry:
+            manifest['stale'].extend(name for name in old_entry.get('files', {}).values()
+                                     if name not in files.values())
+        logos[logo_filename] = {'key': key, 'height': THUMBNAIL_HEIGHT, 'files': files}
+        created.append(logo_filename)
+    
+    save_thumbnail_manifest(manifest)
+    published = {name: logos[name]['files']['1x'] for name in logo_filenames if name in logos}
+    return created, up_to_date, published
+
+def update_sprite(logo_counts, size, webp=THUMBNAIL_WEBP):
+    """
+    Pack the 1x thumbnails of the size most-used logos (logo filename -> factory
+    count) side by side into one content-hashed sprite sheet, recorded in the
+    manifest with each logo's x offset and width. size 0 drops the sprite.
+    """
+    manifest = load_thumbnail_manifest()
+    old_sprite = manifest['sprite']
+    
+    top = sorted(logo_counts, key=lambda name: (-logo_counts[name], name))[:size]
+    top = [name for name in top if name in manifest['logos']]
+    if not top:
+        manifest['sprite'] = None
+    else:
+        entries = [manifest['logos'][name] for name in top]
+        digest = hashlib.sha256('|'.join(entry['key'] for entry in entries).encode()).hexdigest()
+        stem = f"sprite.{digest[:HASH_LENGTH]}"
+        files = {'1x': f"{stem}.png"}
+        if webp:
+            files['1x.webp'] = f"{stem}.webp"
+        
+        if not (old_sprite and old_sprite['files'] == files
+                and all(os.path.exists(os.path.join(OUTPUT_DIR, name)) for name in files.values())):
+            thumbs = [Image.open(os.path.join(OUTPUT_DIR, entry['files']['1x'])) for entry in entries]
+            sheet = Image.new('RGBA', (sum(thumb.width for thumb in thumbs), THUMBNAIL_HEIGHT))
+            positions = {}
+            x = 0
+            for entry, thumb in zip(entries, thumbs):
+                sheet.paste(thumb.convert('RGBA'), (x, 0))
+                positions[entry['files']['1x']] = [x, thumb.width]
+                x += thumb.width
+                thumb.close()
+            for variant, name in files.items():
+                tmp_path = os.path.join(OUTPUT_DIR, name + '.tmp')
+                if name.endswith('.webp'):
+                    sheet.save(tmp_path, 'WEBP', quality=90, method=6)
+                else:
+                    sheet.save(tmp_path, 'PNG', optimize=True)
+                os.replace(tmp_path, os.path.join(OUTPUT_DIR, name))
+            manifest['sprite'] = {'files': files, 'width': sheet.width, 'height': THUMBNAIL_HEIGHT,
+                                  'logos': positions}
+            print(f"Created sprite sheet: {files['1x']} ({len(top)} logos)")
+    
+    if old_sprite and old_sprite != manifest['sprite']:
+        kept = set((manifest['sprite'] or {}).get('files', {}).values())
+        manifest['stale'].extend(name for name in old_sprite['files'].values() if name not in kept)
+    save_thumbnail_manifest(manifest)
+
+def remove_unused_thumbnails(logo_filenames):
+    """
+    Delete thumbnails this script made that are no longer referenced: those of
+    logos not in logo_filenames and files replaced by newer versions.
+    Returns the deleted filenames.
+    """
+    manifest = load_thumbnail_manifest()
+    wanted = set(logo_filenames)
+    unused = manifest['stale']
+    for logo_filename in list(manifest['logos']):
+        if logo_filename not in wanted:
+            unused.extend(manifest['logos'].pop(logo_filename).get('files', {}).values())
+    
+    removed = []
+    for name in dict.fromkeys(unused):
+        try:
+            os.remove(os.path.join(OUTPUT_DIR, name))
+            removed.append(name)
+        except FileNotFoundError:
+            pass
+    
+    manifest['stale'] = []
+    save_thumbnail_manifest(manifest)
+    return removed
+
+def main(incremental=False, scales=THUMBNAIL_SCALES, webp=THUMBNAIL_WEBP, sprite_size=SPRITE_SIZE):
     print("=" * 80)
     print("LOGO MATCHER AND THUMBNAIL GENERATOR")
     print("=" * 80)
     print()
     
-    # Delete and recreate output directory
-    print("Cleaning output directory...")
-    if os.path.exists(OUTPUT_DIR):
-        shutil.rmtree(OUTPUT_DIR)
-        print(f"Deleted {OUTPUT_DIR}")
+    # Existing thumbnails are kept and only rebuilt when their source changes
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    print(f"Created {OUTPUT_DIR}")
+    print(f"Output directory: {OUTPUT_DIR}")
     print()
     
     # Setup database
     print("Setting up database...")
     conn = setup_database()
     cursor = conn.cursor()
-    print("Dropped and recreated 'factory_logos' table")
+    print("Existing 'factory_logos' rows stay in place until the new matches are applied")
     print()
     
     # Get logos and factories
@@ -188,8 +541,19 @@ def main():
     print()
     
     # Find matches
-    print("Finding matches...")
-    matches = find_matches(logos, factories)
+    state = load_match_state(cursor)
+    if incremental and state[0]:
+        print("Finding matches for changed factories and logos...")
+        pairs, changed_factories, added_logos, removed_logos = incremental_match_pairs(logos, factories, state)
+        print(f"{len(changed_factories)} changed factories, {len(added_logos)} new logos, "
+              f"{len(removed_logos)} removed logos")
+        matches = matches_from_pairs(logos, pairs)
+    else:
+        if incremental:
+            print("No previous match state recorded, matching everything")
+        print("Finding matches...")
+        matches = find_matches(logos, factories)
+        pairs = match_pairs(matches)
     print(f"Found {len(matches)} logos with matches")
     
     # Show first few matches for debugging
@@ -206,43 +570,37 @@ def main():
     print(f"Final mappings: {len(final_mappings)} factories will have logos")
     print()
     
-    # Create thumbnails and save to database
-    print("Creating thumbnails and saving to database...")
+    # Create thumbnails (once per logo, published under content-hashed names)
+    print("Creating thumbnails...")
     print("-" * 80)
+    used_logos = list(dict.fromkeys(logo['filename'] for logo in final_mappings.values()))
+    created, up_to_date, published = update_thumbnails(used_logos, scales, webp)
+    for logo_filename in created:
+        print(f"Created thumbnail: {published[logo_filename]}")
+    print(f"{len(created)} created, {len(up_to_date)} unchanged")
     
-    thumbnail_count = 0
-    processed_logos = set()
+    logo_counts = {}
+    for logo in final_mappings.values():
+        logo_counts[logo['filename']] = logo_counts.get(logo['filename'], 0) + 1
+    update_sprite(logo_counts, sprite_size, webp)
+    print()
     
-    for factory_id, logo in final_mappings.items():
-        logo_filename = logo['filename']
-        
-        # Create thumbnail (only once per logo)
-        if logo_filename not in processed_logos:
-            source_path = os.path.join(LOGOS_DIR, logo_filename)
-            # Keep as PNG
-            thumb_filename = logo_filename
-            dest_path = os.path.join(OUTPUT_DIR, thumb_filename)
-            
-            if create_thumbnail(source_path, dest_path):
-                thumbnail_count += 1
-                processed_logos.add(logo_filename)
-                print(f"Created thumbnail: {thumb_filename}")
-            
-            db_filename = thumb_filename
-        else:
-            db_filename = logo_filename
-        
-        # Insert into database
-        try:
-            cursor.execute(
-                "INSERT INTO factory_logos (factory_id, logo_filename) VALUES (?, ?)",
-                (factory_id, db_filename)
-            )
-        except sqlite3.IntegrityError:
-            # Already exists, skip
-            pass
+    # Save to database: one transaction, so the decoder sees either the old or the new mappings
+    print("Saving to database...")
+    print("-" * 80)
     
-    conn.commit()
+    with conn:
+        inserted, deleted = apply_logo_diff(cursor, final_mappings, published)
+        save_match_state(cursor, logos, factories, pairs, state)
+    print(f"factory_logos: +{inserted} -{deleted}")
+    
+    if inserted or deleted:
+        # Tell running decoders to drop their cached logo lists
+        write_seed_stamp(DB_PATH)
+    
+    # Thumbnails no longer in use (or replaced) go only once nothing references them
+    for thumb_filename in remove_unused_thumbnails(used_logos):
+        print(f"Removed unused thumbnail: {thumb_filename}")
     print()
     
     # Summary statistics
@@ -251,7 +609,7 @@ def main():
     print("=" * 80)
     print(f"Total logos processed: {len(logos)}")
     print(f"Logos with matches: {len(matches)}")
-    print(f"Unique thumbnails created: {thumbnail_count}")
+    print(f"Unique thumbnails created: {len(created)} (unchanged: {len(up_to_date)})")
     print(f"Factory-logo mappings created: {len(final_mappings)}")
     print(f"Factories with logos: {len(final_mappings)} / {len(factories)} ({len(final_mappings)/len(factories)*100:.1f}%)")
     print()
@@ -288,10 +646,21 @@ def main():
     print()
     print("=" * 80)
     print(f"Thumbnails saved to: {OUTPUT_DIR}")
-    print("Database table 'factory_logos' created and populated")
+    print("Database table 'factory_logos' updated")
     print("=" * 80)
     
     conn.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Match logos to factories and build thumbnails')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only rematch factories whose manufacturer changed and added or removed logo files')
+    parser.add_argument('--webp', action='store_true',
+                        help='Also write WebP versions of every thumbnail')
+    parser.add_argument('--scales', default=','.join(str(scale) for scale in THUMBNAIL_SCALES),
+                        help='Comma-separated pixel densities to write, e.g. 1,2 for @2x thumbnails')
+    parser.add_argument('--sprite', type=int, default=SPRITE_SIZE, metavar='N',
+                        help='Pack the N most-used logos into one sprite sheet')
+    args = parser.parse_args()
+    main(incremental=args.incremental, webp=args.webp,
+         scales=tuple(int(scale) for scale in args.scales.split(',')), sprite_size=args.sprite)
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .country import Country, WmiRegionCode, WmiCountryCode, WmiFactoryCode
+from .country import Country, WmiRegionCode, WmiCountryRange, WmiFactoryCode, SeedFingerprint
 
-__all__ = ['Country', 'WmiRegionCode', 'WmiCountryCode', 'WmiFactoryCode']
\ No newline at end of file
+__all__ = ['Country', 'WmiRegionCode', 'WmiCountryRange', 'WmiFactoryCode', 'SeedFingerprint']
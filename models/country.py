@@ -43,23 +43,28 @@ class WmiRegionCode(db.Model):
         return f"<WmiRegionCode {self.code} -> {self.country.common_name}>"
 
 
-class WmiCountryCode(db.Model):
-    __tablename__ = 'wmi_country_codes'
+class WmiCountryRange(db.Model):
+    __tablename__ = 'wmi_country_ranges'
     
     id = db.Column(db.Integer, primary_key=True)
-    code = db.Column(db.String(2), nullable=False, index=True)
+    start_code = db.Column(db.String(2), nullable=False)
+    end_code = db.Column(db.String(2), nullable=False)
+    # Positions of start_code/end_code in VIN_CHARACTERS order (see utils.wmi_ranges)
+    start_index = db.Column(db.Integer, nullable=False)
+    end_index = db.Column(db.Integer, nullable=False)
     country_id = db.Column(db.Integer, db.ForeignKey('countries.id', ondelete='CASCADE'), nullable=False)
     
     # Relationships
-    country = db.relationship('Country', backref=db.backref('wmi_country_codes', lazy=True))
+    country = db.relationship('Country', backref=db.backref('wmi_country_ranges', lazy=True))
     
-    # Unique constraint: each code can only belong to a country once
+    # Unique constraint: each range can only belong to a country once
     __table_args__ = (
-        db.UniqueConstraint('code', 'country_id', name='unique_country_code'),
+        db.UniqueConstraint('start_index', 'end_index', 'country_id', name='unique_country_range'),
+        db.Index('ix_wmi_country_ranges_span', 'start_index', 'end_index'),
     )
     
     def __repr__(self):
-        return f"<WmiCountryCode {self.code} -> {self.country.common_name}>"
+        return f"<WmiCountryRange {self.start_code}-{self.end_code} -> {self.country.common_name}>"
 
 
 class WmiFactoryCode(db.Model):
@@ -76,4 +81,14 @@ class WmiFactoryCode(db.Model):
     
     def __repr__(self):
         location = self.country.common_name if self.country else self.region or "Unknown"
-        return f"<WmiFactoryCode {self.wmi} -> {self.manufacturer[:30]}... ({location})>"
\ No newline at end of file
+        return f"<WmiFactoryCode {self.wmi} -> {self.manufacturer[:30]}... ({location})>"
+
+class SeedFingerprint(db.Model):
+    __tablename__ = 'seed_fingerprints'
+    
+    source = db.Column(db.String(200), primary_key=True)  # e.g. json/wmi_region_codes.json
+    sha256 = db.Column(db.String(64), nullable=False)
+    seeded_at = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<SeedFingerprint {self.source} {self.sha256[:12]}>"
@@ -1,37 +1,196 @@
+import argparse
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 
-# Base URL
+# Base URL (point it at a local stand-in server with --base-url for testing)
 BASE_URL = "https://www.carlogos.org"
+PAGE_COUNT = 8  # /car-brands/ plus page-2.html .. page-8.html
 
-# Create output directory
 OUTPUT_DIR = "./logos/brands"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Validators of every page and image, and progress of the current run
+MANIFEST_PATH = "./logos/scrape_manifest.json"
 
-def scrape_page(url):
-    """Scrape a single page and return list of logo data"""
-    print(f"Scraping {url}...")
+WORKERS = 8  # Concurrent downloads
+RATE_LIMIT = 4.0  # Requests per second across all workers (0 = unlimited)
+RATE_BURST = 4  # Requests allowed back to back before the rate applies
+
+MANIFEST_SAVE_EVERY = 25  # Write the manifest after this many finished pages/images...
+MANIFEST_SAVE_INTERVAL = 5.0  # ...or this many seconds, whichever comes first (and on exit)
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, at most capacity saved up"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    def acquire(self):
+        """Take one token, sleeping until it is available"""
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token; a negative balance is the queue of waiting callers
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+class Fetcher:
+    """One pooled session shared by all workers, rate-limited, with conditional GETs"""
+    
+    def __init__(self, workers=WORKERS, rate=RATE_LIMIT, burst=RATE_BURST):
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.bucket = TokenBucket(rate, burst)
+    
+    def get(self, url, validators=None):
+        """
+        GET url, sending If-None-Match/If-Modified-Since from validators (a
+        manifest entry). Returns the response; status 304 means not modified.
+        """
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        
+        self.bucket.acquire()
+        response = self.session.get(url, headers=headers, timeout=10)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+    
+    def close(self):
+        self.session.close()
+
+def response_validators(response):
+    return {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
     }
+
+class ScrapeManifest:
+    """
+    JSON record of page and image validators plus the progress of the current run.
+    A run that did not finish is resumed: pages and images it already handled
+    are not requested again. Progress is written every save_every items or
+    save_interval seconds, and by flush(); an interruption loses at most that much.
+    """
     
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        print(f"Error fetching {url}: {e}")
-        return []
+    def __init__(self, path=MANIFEST_PATH, save_every=MANIFEST_SAVE_EVERY,
+                 save_interval=MANIFEST_SAVE_INTERVAL):
+        self.path = path
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self.lock = threading.Lock()
+        # Serializes file writes, which happen outside self.lock
+        self.save_lock = threading.Lock()
+        self._version = 0  # Bumped on every change
+        self._saved_version = 0
+        self._saved_at = time.monotonic()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.pages = data.get('pages', {})
+        self.images = data.get('images', {})
+        self.run = data.get('run') or {'complete': True, 'done': []}
+    
+    def start_run(self):
+        """Begin a run; returns True if an interrupted run is being resumed"""
+        with self.lock:
+            resuming = not self.run['complete']
+            if not resuming:
+                self.run = {'complete': False, 'done': []}
+            self._done = set(self.run['done'])
+            self._version += 1
+        self.flush()
+        return resuming
+    
+    def finish_run(self):
+        with self.lock:
+            self.run = {'complete': True, 'done': []}
+            self._version += 1
+        self.flush()
+    
+    def is_done(self, key):
+        """Whether key (a page URL or image filename) was handled earlier in this run"""
+        return key in self._done
     
-    soup = BeautifulSoup(response.content, 'html.parser')
+    def record_page(self, url, validators, logos):
+        with self.lock:
+            self.pages[url] = {**validators, 'logos': logos}
+            due = self._mark_done(url)
+        if due:
+            self.flush()
+    
+    def record_image(self, filename, url, validators=None):
+        with self.lock:
+            if validators is not None:
+                self.images[filename] = {'url': url, **validators}
+            due = self._mark_done(filename)
+        if due:
+            self.flush()
+    
+    def _mark_done(self, key):
+        """Record key as handled; returns whether a save is due"""
+        if key not in self._done:
+            self._done.add(key)
+            self.run['done'].append(key)
+        self._version += 1
+        return (self._version - self._saved_version >= self.save_every
+                or time.monotonic() - self._saved_at >= self.save_interval)
+    
+    def flush(self):
+        """Write any unsaved changes (atomically, via a temp file and rename)"""
+        with self.save_lock:
+            with self.lock:
+                if self._version == self._saved_version:
+                    return
+                version = self._version
+                content = json.dumps({'pages': self.pages, 'images': self.images, 'run': self.run}, indent=2)
+                # Claimed now, so workers finishing meanwhile don't queue up more saves
+                self._saved_version = version
+                self._saved_at = time.monotonic()
+            
+            # Workers keep recording while the file is written
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, self.path)
+
+def parse_logo_list(content, base_url=BASE_URL):
+    """Return the logo data ({'brand', 'img_url'}) listed on a brands page"""
+    soup = BeautifulSoup(content, 'html.parser')
     logo_list = soup.find('ul', class_='logo-list')
     
     if not logo_list:
-        print(f"No logo list found on {url}")
-        return []
+        return None
     
     logos = []
     for li in logo_list.find_all('li'):
@@ -40,76 +199,155 @@ def scrape_page(url):
         
         if a_tag and img_tag:
             # Get the brand name (text directly in the <a> tag, excluding labels)
-            brand_name = a_tag.find(text=True, recursive=False).strip()
-            img_url = urljoin(BASE_URL, img_tag['src'])
+            brand_name = a_tag.find(string=True, recursive=False).strip()
+            img_url = urljoin(base_url, img_tag['src'])
             
             logos.append({
                 'brand': brand_name,
                 'img_url': img_url
             })
     
-    print(f"Found {len(logos)} logos on this page")
     return logos
 
-def download_image(img_url, brand_name):
-    """Download an image and save it with the brand name"""
-    # Clean the brand name for use as filename
-    filename = f"{brand_name.lower().replace(' ', '_')}.png"
+def scrape_page(fetcher, manifest, url, base_url=BASE_URL):
+    """Scrape a single page and return list of logo data (the recorded list if unchanged, None on error)"""
+    known = manifest.pages.get(url)
+    if known and manifest.is_done(url):
+        print(f"Resuming: {url} already scraped ({len(known['logos'])} logos)")
+        return known['logos']
+    
+    print(f"Scraping {url}...")
+    
+    try:
+        response = fetcher.get(url, known)
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {e}")
+        return None
+    
+    if response.status_code == 304:
+        print(f"Not modified: {url} ({len(known['logos'])} logos)")
+        manifest.record_page(url, known, known['logos'])
+        return known['logos']
+    
+    logos = parse_logo_list(response.content, base_url)
+    if logos is None:
+        print(f"No logo list found on {url}")
+        return []
+    
+    manifest.record_page(url, response_validators(response), logos)
+    print(f"Found {len(logos)} logos on {url}")
+    return logos
+
+def logo_filename(brand_name):
+    """Clean the brand name for use as filename"""
+    return f"{brand_name.lower().replace(' ', '_')}.png"
+
+def download_image(fetcher, manifest, img_url, brand_name, refresh=False):
+    """
+    Download an image and save it with the brand name.
+    Returns 'downloaded', 'unchanged', 'skipped' or 'failed'.
+    """
+    filename = logo_filename(brand_name)
     filepath = os.path.join(OUTPUT_DIR, filename)
+    known = manifest.images.get(filename)
+    exists = os.path.exists(filepath)
     
-    # Skip if already downloaded
-    if os.path.exists(filepath):
+    if exists and manifest.is_done(filename):
+        return 'skipped'
+    
+    # Files from before the manifest existed are kept unless a refresh is asked for
+    if exists and not known and not refresh:
         print(f"  {filename} already exists, skipping...")
-        return True
+        manifest.record_image(filename, img_url)
+        return 'skipped'
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    # Revalidate only a file we still have, from the same URL
+    validators = known if exists and known and known.get('url') == img_url else None
     
     try:
-        response = requests.get(img_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        
-        print(f"  Downloaded: {filename}")
-        return True
+        response = fetcher.get(img_url, validators)
     except requests.RequestException as e:
         print(f"  Error downloading {img_url}: {e}")
-        return False
-
-def main():
-    # URLs to scrape
-    urls = ["https://www.carlogos.org/car-brands/"]
-    urls.extend([f"https://www.carlogos.org/car-brands/page-{i}.html" for i in range(2, 9)])
+        return 'failed'
     
-    all_logos = []
+    if response.status_code == 304:
+        manifest.record_image(filename, img_url, {k: known[k] for k in ('etag', 'last_modified')})
+        return 'unchanged'
     
-    # Scrape all pages
-    for url in urls:
-        logos = scrape_page(url)
-        all_logos.extend(logos)
-        time.sleep(1)  # Be polite, wait between requests
+    # Write beside the target and rename, so an interrupted run never leaves half a file
+    tmp_path = f"{filepath}.tmp{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(response.content)
+    os.replace(tmp_path, filepath)
     
-    print(f"\n{'='*60}")
-    print(f"Total logos found: {len(all_logos)}")
-    print(f"{'='*60}\n")
-    
-    # Download all images
-    print("Downloading images...\n")
-    success_count = 0
-    for i, logo in enumerate(all_logos, 1):
-        print(f"[{i}/{len(all_logos)}] {logo['brand']}")
-        if download_image(logo['img_url'], logo['brand']):
-            success_count += 1
-        time.sleep(0.5)  # Be polite between downloads
+    manifest.record_image(filename, img_url, response_validators(response))
+    print(f"  Downloaded: {filename}")
+    return 'downloaded'
+
+def page_urls(base_url=BASE_URL, page_count=PAGE_COUNT):
+    urls = [f"{base_url}/car-brands/"]
+    urls.extend([f"{base_url}/car-brands/page-{i}.html" for i in range(2, page_count + 1)])
+    return urls
+
+def main(base_url=BASE_URL, workers=WORKERS, rate=RATE_LIMIT, burst=RATE_BURST, refresh=False):
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    manifest = ScrapeManifest(MANIFEST_PATH)
+    if manifest.start_run():
+        print(f"Resuming interrupted run ({len(manifest.run['done'])} items already done)")
+    
+    fetcher = Fetcher(workers, rate, burst)
+    try:
+        # Scrape all pages
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pages = list(pool.map(lambda url: scrape_page(fetcher, manifest, url, base_url),
+                                  page_urls(base_url)))
+        failed_pages = pages.count(None)
+        all_logos = [logo for logos in pages if logos for logo in logos]
+        
+        print(f"\n{'='*60}")
+        print(f"Total logos found: {len(all_logos)}")
+        print(f"{'='*60}\n")
+        
+        # Download all images
+        print("Downloading images...\n")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                lambda logo: download_image(fetcher, manifest, logo['img_url'], logo['brand'], refresh),
+                all_logos
+            ))
+    finally:
+        fetcher.close()
+        # Also on errors and Ctrl+C, so a rerun resumes where this one stopped
+        manifest.flush()
+    
+    failed = results.count('failed')
+    if not failed and not failed_pages:
+        manifest.finish_run()
     
     print(f"\n{'='*60}")
     print(f"Download complete!")
-    print(f"Successfully downloaded: {success_count}/{len(all_logos)} logos")
+    print(f"Downloaded: {results.count('downloaded')}, unchanged: {results.count('unchanged')}, "
+          f"skipped: {results.count('skipped')}, failed: {failed}")
+    print(f"Successfully handled: {len(results) - failed}/{len(all_logos)} logos")
+    if failed_pages:
+        print(f"Pages that could not be fetched: {failed_pages}")
+    if failed or failed_pages:
+        print("Run again to retry the failed requests (finished ones are not fetched again)")
     print(f"Saved to: {OUTPUT_DIR}")
     print(f"{'='*60}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Download car brand logos')
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help='Site to scrape (e.g. a local stand-in server for testing)')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='Concurrent requests')
+    parser.add_argument('--rate', type=float, default=RATE_LIMIT,
+                        help='Requests per second across all workers (0 = unlimited)')
+    parser.add_argument('--burst', type=int, default=RATE_BURST,
+                        help='Requests allowed back to back before the rate applies')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Also re-download logos that were saved before the manifest existed')
+    args = parser.parse_args()
+    main(base_url=args.base_url.rstrip('/'), workers=args.workers, rate=args.rate,
+         burst=args.burst, refresh=args.refresh)
@@ -1,4 +1,4 @@
-from .country_seeder import seed_countries
+from .country_seeder import seed_countries, load_countries
 from .wmi_region_code_seeder import seed_wmi_region_codes
 from .wmi_country_code_seeder import seed_wmi_country_codes
 from .fill_missing_ranges import fill_missing_wmi_ranges
@@ -1,94 +1,164 @@
+import hashlib
+import json
+import os
 import requests
 from models.country import Country, db
 from utils import get_first_value, get_calling_code, map_region
+from utils.seed_profile import execute_batched
+from utils.progress import ProgressReporter, log, INFO, ERROR
 
+COUNTRIES_URL = 'https://raw.githubusercontent.com/mledoze/countries/master/countries.json'
+
+# Local copy of the dataset (seeding reads this, the network is only used to refresh it)
+COUNTRIES_CACHE = './json/countries.json'
+COUNTRIES_CACHE_HASH = COUNTRIES_CACHE + '.sha256'
+
+
+def download_countries():
+    """Download the mledoze/countries dataset and store it as the local cache"""
+    log(INFO, "\n📥 Downloading countries data from mledoze/countries...")
+
+    response = requests.get(COUNTRIES_URL, timeout=30)
+    response.raise_for_status()
+    raw = response.content
+    countries = json.loads(raw)
+
+    # Write beside the cache and rename, so an interrupted download never leaves half a file.
+    # The hash goes first: a crash in between leaves a mismatch, never an unchecked cache
+    tmp_path = f"{COUNTRIES_CACHE}.tmp{os.getpid()}"
+    tmp_hash_path = f"{COUNTRIES_CACHE_HASH}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(raw)
+    with open(tmp_hash_path, 'w', encoding='utf-8') as f:
+        f.write(hashlib.sha256(raw).hexdigest() + '\n')
+    os.replace(tmp_hash_path, COUNTRIES_CACHE_HASH)
+    os.replace(tmp_path, COUNTRIES_CACHE)
+
+    log(INFO, f"✓ Downloaded {len(countries)} countries, cached in {COUNTRIES_CACHE}")
+    return countries, raw
+
+
+def load_countries(refresh=False):
+    """
+    Return (countries, raw bytes) from the local cache.
+    Downloads only when refresh is set or no cache exists yet.
+    Raises ValueError if the cache has no recorded hash or does not match it.
+    """
+    if refresh or not os.path.exists(COUNTRIES_CACHE):
+        return download_countries()
+
+    with open(COUNTRIES_CACHE, 'rb') as f:
+        raw = f.read()
+
+    if not os.path.exists(COUNTRIES_CACHE_HASH):
+        log(ERROR, f"❌ {COUNTRIES_CACHE} has no recorded hash ({COUNTRIES_CACHE_HASH} is missing)")
+        raise ValueError(f"{COUNTRIES_CACHE} cannot be verified without {COUNTRIES_CACHE_HASH}; "
+                         f"refresh the cache (--refresh-countries) to download it again")
+
+    with open(COUNTRIES_CACHE_HASH, 'r', encoding='utf-8') as f:
+        expected = f.read().strip()
+    if hashlib.sha256(raw).hexdigest() != expected:
+        raise ValueError(f"{COUNTRIES_CACHE} does not match {COUNTRIES_CACHE_HASH}; "
+                         f"refresh the cache (--refresh-countries) to download it again")
+
+    countries = json.loads(raw)
+    log(INFO, f"\n📂 Loaded {len(countries)} countries from {COUNTRIES_CACHE}")
+    return countries, raw
+
+
+def country_row(country_data):
+    """Country column values for one mledoze/countries entry"""
+    return {
+        'iso_alpha2': country_data.get('cca2'),
+        'iso_alpha3': country_data.get('cca3'),
+        'iso_numeric': country_data.get('ccn3'),
+        'name': country_data.get('name', {}).get('official', country_data['name']['common']),
+        'common_name': country_data.get('name', {}).get('common'),
+        'region': map_region(country_data.get('region'), country_data.get('subregion')),
+        'subregion': country_data.get('subregion'),
+        'currency_code': get_first_value(country_data.get('currencies')),
+        'calling_code': get_calling_code(country_data.get('idd', {})),
+        'tld': country_data.get('tld', [None])[0],
+        'flag_emoji': country_data.get('flag'),
+        'is_active': True
+    }
+
+
+# Special "Unknown" country for unassigned/invalid VIN ranges
+UNKNOWN_COUNTRY_ROW = {
+    'iso_alpha2': 'XX',
+    'iso_alpha3': 'XXX',
+    'iso_numeric': '999',
+    'name': 'Unknown',
+    'common_name': 'Unknown',
+    'region': 'Unknown',
+    'subregion': 'Unknown',
+    'currency_code': None,
+    'calling_code': None,
+    'tld': None,
+    'flag_emoji': '🏳',
+    'is_active': True
+}
+
+
+def seed_countries(countries=None, refresh=False):
+    """Seed countries data from mledoze/countries (the local cache unless given)"""
+
+    progress = ProgressReporter('seed_countries', unit='countries')
 
-def seed_countries():
-    """Download and seed countries data from mledoze/countries repository"""
-    
-    url = 'https://raw.githubusercontent.com/mledoze/countries/master/countries.json'
-    
-    print("\n📥 Downloading countries data from mledoze/countries...")
-    
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        countries = response.json()
-        
-        print(f"✓ Downloaded {len(countries)} countries")
-        print("💾 Processing and inserting into database...")
-        
-        inserted_count = 0
-        skipped_count = 0
-        
+        if countries is None:
+            countries, _ = load_countries(refresh)
+
+        progress.total = len(countries)
+        progress.info("💾 Processing and inserting into database...")
+
+        # One read of the existing codes instead of a query per country
+        existing_codes = set(db.session.execute(db.select(Country.iso_alpha2)).scalars())
+        new_rows = []
+
         for country_data in countries:
+            progress.advance()
             # Check if country already exists
             iso_alpha2 = country_data.get('cca2')
-            
+
             if not iso_alpha2:
-                print(f"⚠ Skipping country without ISO Alpha-2 code")
-                skipped_count += 1
+                progress.record_error(f"⚠ Skipping country without ISO Alpha-2 code")
+                progress.count('skipped')
                 continue
-            
-            existing = Country.query.filter_by(iso_alpha2=iso_alpha2).first()
-            
-            if existing:
-                skipped_count += 1
+
+            if iso_alpha2 in existing_codes:
+                progress.count('skipped')
                 continue
-            
-            # Create new country record
-            country = Country(
-                iso_alpha2=iso_alpha2,
-                iso_alpha3=country_data.get('cca3'),
-                iso_numeric=country_data.get('ccn3'),
-                name=country_data.get('name', {}).get('official', country_data['name']['common']),
-                common_name=country_data.get('name', {}).get('common'),
-                region=map_region(country_data.get('region'), country_data.get('subregion')),
-                subregion=country_data.get('subregion'),
-                currency_code=get_first_value(country_data.get('currencies')),
-                calling_code=get_calling_code(country_data.get('idd', {})),
-                tld=country_data.get('tld', [None])[0],
-                flag_emoji=country_data.get('flag'),
-                is_active=True
-            )
-            
-            db.session.add(country)
-            print(f"✓ {country.common_name}")
-            inserted_count += 1
-        
-        # Add special "Unknown" country for unassigned/invalid VIN ranges
-        unknown_country = Country.query.filter_by(iso_alpha2='XX').first()
-        if not unknown_country:
-            unknown_country = Country(
-                iso_alpha2='XX',
-                iso_alpha3='XXX',
-                iso_numeric='999',
-                name='Unknown',
-                common_name='Unknown',
-                region='Unknown',
-                subregion='Unknown',
-                currency_code=None,
-                calling_code=None,
-                tld=None,
-                flag_emoji='🏳',
-                is_active=True
-            )
-            db.session.add(unknown_country)
-            print(f"✓ Unknown (special catch-all country)")
-            inserted_count += 1
-        
+
+            row = country_row(country_data)
+            new_rows.append(row)
+            existing_codes.add(iso_alpha2)
+            progress.debug(f"✓ {row['common_name']}")
+            progress.count('inserted')
+
+        if UNKNOWN_COUNTRY_ROW['iso_alpha2'] not in existing_codes:
+            new_rows.append(dict(UNKNOWN_COUNTRY_ROW))
+            progress.debug(f"✓ Unknown (special catch-all country)")
+            progress.count('inserted')
+
+        if new_rows:
+            execute_batched(db.insert(Country), new_rows)
+
         # Commit all changes
         db.session.commit()
-        
-        print("="*50)
-        print(f"✅ Successfully seeded {inserted_count} countries!")
-        print(f"⊘ Skipped {skipped_count} countries")
-        print("="*50)
-        
+
+        progress.info("="*50)
+        progress.info(f"✅ Successfully seeded {progress.counts['inserted']} countries!")
+        progress.info(f"⊘ Skipped {progress.counts['skipped']} countries")
+        progress.info("="*50)
+
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error downloading data: {e}")
+        progress.error(f"❌ Error downloading data: {e}")
         db.session.rollback()
     except Exception as e:
-        print(f"❌ Error processing data: {e}")
+        progress.error(f"❌ Error processing data: {e}")
         db.session.rollback()
-        raise
\ No newline at end of file
+        raise
+    finally:
+        progress.finish()
@@ -0,0 +1,218 @@
+"""
+Incremental (differential) reseeding
+Fingerprints the seed sources, and when any of them changed, diffs a freshly
+seeded staging database against the live tables and applies only the
+inserts, updates and deletes, in one transaction. Rows are matched on their
+natural keys (ISO code, WMI code), so unchanged factories keep their ids and
+the factory_logos table built by match_logos.py stays valid.
+"""
+import hashlib
+import sqlite3
+from datetime import datetime
+
+from models.country import SeedFingerprint, db
+from utils.progress import log, INFO
+
+# Source files read by the seeders, fingerprinted alongside the countries dataset
+SEED_SOURCES = [
+    'json/wmi_region_codes.json',
+    'json/wmi_country_codes.json',
+    'json/wmi_factory_codes.json'
+]
+
+COUNTRIES_SOURCE = 'countries'
+
+# Recorded with the fingerprints; bump when the seeded tables change shape
+SEED_FORMAT_SOURCE = 'seed_format'
+SEED_FORMAT_VERSION = '2'
+
+COUNTRY_COLUMNS = [
+    'iso_alpha3', 'iso_numeric', 'name', 'common_name', 'region', 'subregion',
+    'currency_code', 'calling_code', 'tld', 'flag_emoji', 'is_active'
+]
+
+RANGE_COLUMNS = ['start_code', 'end_code', 'start_index', 'end_index']
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_sources(countries_raw):
+    """Return {source: sha256} for the JSON sources and the countries dataset, plus the seed format"""
+    fingerprints = {source: file_sha256(source) for source in SEED_SOURCES}
+    fingerprints[COUNTRIES_SOURCE] = hashlib.sha256(countries_raw).hexdigest()
+    fingerprints[SEED_FORMAT_SOURCE] = SEED_FORMAT_VERSION
+    return fingerprints
+
+
+def load_fingerprints():
+    """Fingerprints recorded by the last seed"""
+    return {row.source: row.sha256 for row in SeedFingerprint.query.all()}
+
+
+def store_fingerprints(fingerprints):
+    """Replace the recorded fingerprints (committed with the caller's transaction)"""
+    now = datetime.utcnow()
+    db.session.execute(db.delete(SeedFingerprint))
+    db.session.execute(db.insert(SeedFingerprint), [
+        {'source': source, 'sha256': sha256, 'seeded_at': now}
+        for source, sha256 in sorted(fingerprints.items())
+    ])
+
+
+def changed_sources(fingerprints):
+    """Sources whose fingerprint differs from the recorded one"""
+    recorded = load_fingerprints()
+    return sorted(source for source, sha256 in fingerprints.items() if recorded.get(source) != sha256)
+
+
+def read_staging_rows(staging_path):
+    """Read the seeded staging tables keyed on natural keys"""
+    conn = sqlite3.connect(staging_path)
+    try:
+        countries = {
+            row[0]: tuple(row[1:]) for row in conn.execute(
+                f"SELECT iso_alpha2, {', '.join(COUNTRY_COLUMNS)} FROM countries"
+            )
+        }
+        region_codes = set(conn.execute(
+            "SELECT r.code, c.iso_alpha2 FROM wmi_region_codes r JOIN countries c ON c.id = r.country_id"
+        ))
+        country_ranges = set(conn.execute(
+            f"SELECT {', '.join('w.' + c for c in RANGE_COLUMNS)}, c.iso_alpha2 "
+            "FROM wmi_country_ranges w JOIN countries c ON c.id = w.country_id"
+        ))
+        factories = {
+            row[0]: tuple(row[1:]) for row in conn.execute(
+                "SELECT f.wmi, f.manufacturer, c.iso_alpha2, f.region "
+                "FROM wmi_factory_codes f LEFT JOIN countries c ON c.id = f.country_id"
+            )
+        }
+    finally:
+        conn.close()
+    return countries, region_codes, country_ranges, factories
+
+
+def diff_code_table(table, columns, staged, country_ids):
+    """Insert/delete the (*columns, country) rows of a region code or country range table"""
+    selected = ', '.join('t.' + c for c in columns)
+    live = {
+        tuple(row[1:]): row[0] for row in db.session.execute(db.text(
+            f"SELECT t.id, {selected}, c.iso_alpha2 FROM {table} t JOIN countries c ON c.id = t.country_id"
+        ))
+    }
+
+    inserts = [
+        dict(zip(columns, key[:-1]), country_id=country_ids[key[-1]])
+        for key in sorted(staged - live.keys())
+    ]
+    deletes = [{'id': live[key]} for key in sorted(live.keys() - staged)]
+
+    if deletes:
+        db.session.execute(db.text(f"DELETE FROM {table} WHERE id = :id"), deletes)
+    if inserts:
+        db.session.execute(db.text(
+            f"INSERT INTO {table} ({', '.join(columns)}, country_id) "
+            f"VALUES ({', '.join(':' + c for c in columns)}, :country_id)"
+        ), inserts)
+    return {'inserted': len(inserts), 'updated': 0, 'deleted': len(deletes)}
+
+
+def apply_seed_diff(staging_path):
+    """
+    Bring the live tables in line with a seeded staging database.
+    Runs in the current session; the caller commits (or rolls back).
+    Returns {table: {'inserted', 'updated', 'deleted'}}.
+    """
+    staged_countries, staged_regions, staged_country_ranges, staged_factories = read_staging_rows(staging_path)
+    summary = {}
+
+    # Countries: insert and update first, delete last (after the rows referencing them)
+    live_countries = {
+        row[1]: (row[0], tuple(row[2:])) for row in db.session.execute(db.text(
+            f"SELECT id, iso_alpha2, {', '.join(COUNTRY_COLUMNS)} FROM countries"
+        ))
+    }
+    country_inserts = []
+    country_updates = []
+    for iso, values in sorted(staged_countries.items()):
+        row = dict(zip(COUNTRY_COLUMNS, values), iso_alpha2=iso)
+        if iso not in live_countries:
+            country_inserts.append(row)
+        elif live_countries[iso][1] != values:
+            country_updates.append(row)
+    country_deletes = [{'id': live_countries[iso][0]} for iso in sorted(live_countries.keys() - staged_countries.keys())]
+
+    columns = ', '.join(['iso_alpha2'] + COUNTRY_COLUMNS)
+    params = ', '.join(f":{c}" for c in ['iso_alpha2'] + COUNTRY_COLUMNS)
+    if country_inserts:
+        db.session.execute(db.text(f"INSERT INTO countries ({columns}) VALUES ({params})"), country_inserts)
+    if country_updates:
+        assignments = ', '.join(f"{c} = :{c}" for c in COUNTRY_COLUMNS)
+        db.session.execute(db.text(f"UPDATE countries SET {assignments} WHERE iso_alpha2 = :iso_alpha2"),
+                           country_updates)
+    summary['countries'] = {'inserted': len(country_inserts), 'updated': len(country_updates),
+                            'deleted': len(country_deletes)}
+
+    country_ids = dict(db.session.execute(db.text("SELECT iso_alpha2, id FROM countries")).all())
+
+    summary['wmi_region_codes'] = diff_code_table('wmi_region_codes', ['code'], staged_regions, country_ids)
+    summary['wmi_country_ranges'] = diff_code_table('wmi_country_ranges', RANGE_COLUMNS,
+                                                    staged_country_ranges, country_ids)
+
+    # Factories: matched on WMI and updated in place so their ids (and logos) survive
+    live_factories = {
+        row[1]: (row[0], tuple(row[2:])) for row in db.session.execute(db.text(
+            "SELECT f.id, f.wmi, f.manufacturer, c.iso_alpha2, f.region "
+            "FROM wmi_factory_codes f LEFT JOIN countries c ON c.id = f.country_id"
+        ))
+    }
+    factory_inserts = []
+    factory_updates = []
+    for wmi, (manufacturer, iso, region) in sorted(staged_factories.items()):
+        row = {'wmi': wmi, 'manufacturer': manufacturer, 'country_id': country_ids.get(iso), 'region': region}
+        if wmi not in live_factories:
+            factory_inserts.append(row)
+        elif live_factories[wmi][1] != (manufacturer, iso, region):
+            factory_updates.append(row)
+    factory_deletes = [{'id': live_factories[wmi][0]}
+                       for wmi in sorted(live_factories.keys() - staged_factories.keys())]
+
+    if factory_deletes:
+        has_logos = db.session.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'factory_logos'"
+        )).first()
+        if has_logos:
+            db.session.execute(db.text("DELETE FROM factory_logos WHERE factory_id = :id"), factory_deletes)
+        db.session.execute(db.text("DELETE FROM wmi_factory_codes WHERE id = :id"), factory_deletes)
+    if factory_inserts:
+        db.session.execute(db.text(
+            "INSERT INTO wmi_factory_codes (wmi, manufacturer, country_id, region) "
+            "VALUES (:wmi, :manufacturer, :country_id, :region)"
+        ), factory_inserts)
+    if factory_updates:
+        db.session.execute(db.text(
+            "UPDATE wmi_factory_codes SET manufacturer = :manufacturer, country_id = :country_id, "
+            "region = :region WHERE wmi = :wmi"
+        ), factory_updates)
+    summary['wmi_factory_codes'] = {'inserted': len(factory_inserts), 'updated': len(factory_updates),
+                                    'deleted': len(factory_deletes)}
+
+    if country_deletes:
+        db.session.execute(db.text("DELETE FROM countries WHERE id = :id"), country_deletes)
+
+    return summary
+
+
+def print_seed_diff(summary):
+    """Print the per-table counts of an applied diff"""
+    log(INFO, "="*50)
+    for table, counts in summary.items():
+        log(INFO, f"  {table:<20} +{counts['inserted']} ~{counts['updated']} -{counts['deleted']}")
+    log(INFO, "="*50)
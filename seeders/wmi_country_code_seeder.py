@@ -1,97 +1,84 @@
 import json
-from models.country import WmiCountryCode, db
-from utils import find_country_by_name
+from collections import namedtuple
+from models.country import WmiCountryRange, db
+from utils import CountryResolver
+from utils.wmi_ranges import parse_code_range, code_index
+from utils.seed_profile import execute_batched
+from utils.progress import ProgressReporter
+from utils.parallel import parallel_map, wait_for
 
-# Valid VIN characters in order (excluding I, O, Q)
-VIN_CHARACTERS = [
-    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'J', 'K', 'L', 'M', 
-    'N', 'P', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
-    '1', '2', '3', '4', '5', '6', '7', '8', '9', '0'
-]
+WMI_COUNTRY_CODES_FILE = "./json/wmi_country_codes.json"
 
+ParsedCountryRange = namedtuple('ParsedCountryRange', [
+    'range_str', 'location_name', 'intervals', 'invalid_count', 'warnings'
+])
 
-def expand_range(range_str):
+
+def parse_country_code_entry(entry):
     """
-    Expand a range string into individual 2-character codes.
-    Examples:
-        'AA-AH' -> ['AA', 'AB', 'AC', 'AD', 'AE', 'AF', 'AG', 'AH']
-        'H' -> ['HA', 'HB', ..., 'HZ', 'H0', 'H1', ..., 'H9']
-        'PV' -> ['PV']
-        '1, 4, 5' -> ['1A', '1B', ..., '1Z', '10', ..., '4A', ..., '5A', ...]
+    Parse one country code entry into a ParsedCountryRange of
+    (start_code, end_code, start_index, end_index) intervals.
+    Touches no database, so it can run in a worker process.
     """
-    range_str = range_str.strip()
-    codes = []
-    
-    # Handle comma-separated values (e.g., "1, 4, 5")
-    if ',' in range_str:
-        parts = [p.strip() for p in range_str.split(',')]
-        for part in parts:
-            codes.extend(expand_range(part))
-        return codes
-    
-    # Handle range (e.g., "AA-AH")
-    if '-' in range_str:
-        start, end = range_str.split('-')
-        start = start.strip()
-        end = end.strip()
-        
-        # Both should be 2 characters
-        if len(start) == 2 and len(end) == 2:
-            first_char = start[0]
-            start_second = start[1]
-            end_second = end[1]
-            
-            # Find indices in VIN_CHARACTERS
-            try:
-                start_idx = VIN_CHARACTERS.index(start_second)
-                end_idx = VIN_CHARACTERS.index(end_second)
-                
-                # Generate all codes in range
-                for i in range(start_idx, end_idx + 1):
-                    codes.append(first_char + VIN_CHARACTERS[i])
-            except ValueError as e:
-                print(f"⚠ Invalid character in range '{range_str}': {e}")
-        else:
-            print(f"⚠ Invalid range format '{range_str}': expected 2-char codes")
-    
-    # Single character - expand to all combinations (e.g., "H" -> "HA" to "H9")
-    elif len(range_str) == 1:
-        first_char = range_str
-        for second_char in VIN_CHARACTERS:
-            codes.append(first_char + second_char)
-    
-    # Exact 2-character code (e.g., "PV")
-    elif len(range_str) == 2:
-        codes.append(range_str)
-    
-    else:
-        print(f"⚠ Unknown range format: '{range_str}'")
-    
-    return codes
+    range_str = entry.get('range', '')
+    intervals = []
+    invalid_count = 0
+    warnings = []
+    for start_code, end_code in parse_code_range(range_str, warnings):
+        start_index, end_index = code_index(start_code), code_index(end_code)
+        if start_index is None or end_index is None:
+            invalid_count += 1
+            continue
+        intervals.append((start_code, end_code, start_index, end_index))
+    return ParsedCountryRange(range_str, entry.get('country', ''), intervals, invalid_count, warnings)
+
+
+def load_country_code_entries(path=WMI_COUNTRY_CODES_FILE, workers=None):
+    """Read a country code file and parse its entries in a worker pool (in file order)"""
+    with open(path, "r", encoding="utf-8") as f:
+        wmi_data = json.load(f)
+    return parallel_map(parse_country_code_entry, wmi_data, workers)
 
 
-def seed_wmi_country_codes():
-    """Seed WMI country codes from JSON file"""
+def seed_wmi_country_codes(resolver=None, parsed=None, workers=None):
+    """
+    Seed WMI country codes from JSON file, one [start, end] row per range.
+    Pass a CountryResolver to share one country name index across seeders,
+    and the result of load_country_code_entries (or a Future of it) if the
+    file was already parsed concurrently.
+    """
     
-    print("\n📥 Loading WMI country codes from ./json/wmi_country_codes.json...")
+    progress = ProgressReporter('seed_wmi_country_codes')
+    progress.info(f"\n📥 Loading WMI country codes from {WMI_COUNTRY_CODES_FILE}...")
     
     # List of known regions (not countries)
     KNOWN_REGIONS = ['Africa', 'Asia', 'Europe', 'North America', 'South America', 'Oceania']
     
     try:
-        with open("./json/wmi_country_codes.json", "r", encoding="utf-8") as f:
-            wmi_data = json.load(f)
+        if parsed is None:
+            parsed = load_country_code_entries(workers=workers)
+        parsed = wait_for(parsed)
         
-        print("✓ Loaded WMI country codes data")
-        print("💾 Processing and inserting into database...")
+        progress.total = len(parsed)
+        progress.info("✓ Loaded WMI country codes data")
+        progress.info("💾 Processing and inserting into database...")
         
-        inserted_count = 0
-        skipped_count = 0
-        errors = []
+        owns_resolver = resolver is None
+        if owns_resolver:
+            resolver = CountryResolver.load()
         
-        for entry in wmi_data:
-            range_str = entry.get('range', '')
-            location_name = entry.get('country', '')
+        # One up-front read of the (start, end, country_id) ranges already in the table
+        existing_ranges = set(db.session.query(
+            WmiCountryRange.start_index, WmiCountryRange.end_index, WmiCountryRange.country_id
+        ))
+        new_rows = []
+        
+        for entry in parsed:
+            progress.advance()
+            for warning in entry.warnings:
+                progress.warning(warning)
+            range_str = entry.range_str
+            location_name = entry.location_name
             
             # Check if it's a region or a country
             is_region = location_name in KNOWN_REGIONS
@@ -99,83 +86,81 @@ def seed_wmi_country_codes():
             if is_region:
                 # For region entries, use the first country we find in that region as a placeholder
                 # This allows the codes to be in the database for factory code lookups
-                country = country.query.filter_by(region=location_name).first()
+                country = resolver.first_in_region(location_name)
                 
                 if not country:
-                    error_msg = f"⚠ No countries found in region: {location_name} (range: {range_str})"
-                    print(error_msg)
-                    errors.append(error_msg)
-                    skipped_count += 1
+                    progress.record_error(f"⚠ No countries found in region: {location_name} (range: {range_str})")
+                    progress.count('skipped')
                     continue
                 
-                print(f"\n📍 Region: {location_name} ({range_str}) → Linked to {country.common_name}")
+                progress.debug(f"\n📍 Region: {location_name} ({range_str}) → Linked to {country.common_name}")
             else:
                 # Find the country in the database
-                country = find_country_by_name(location_name)
+                country = resolver.resolve(location_name)
             
                 if not country:
-                    error_msg = f"⚠ Country not found: {location_name} (range: {range_str})"
-                    print(error_msg)
-                    errors.append(error_msg)
+                    progress.record_error(f"⚠ Country not found: {location_name} (range: {range_str})")
                     continue
             
-            # Expand the range into individual codes
-            codes = expand_range(range_str)
+            # The range was parsed into [start, end] intervals up front (no per-code expansion)
+            for _ in range(entry.invalid_count):
+                progress.warning(f"⚠ Invalid character in range '{range_str}'")
+            intervals = entry.intervals
             
-            if not codes:
-                error_msg = f"⚠ No codes generated for range: {range_str}"
-                print(error_msg)
-                errors.append(error_msg)
+            if not intervals:
+                progress.record_error(f"⚠ No codes generated for range: {range_str}")
                 continue
             
+            code_count = sum(end_index - start_index + 1 for _, _, start_index, end_index in intervals)
             if not is_region:
-                print(f"\n🌍 {country.common_name}: {range_str} ({len(codes)} codes)")
+                progress.debug(f"\n🌍 {country.common_name}: {range_str} ({code_count} codes)")
             
-            # Insert each code
-            for code in codes:
-                # Check if this code already exists for this country
-                existing = WmiCountryCode.query.filter_by(
-                    code=code,
-                    country_id=country.id
-                ).first()
-                
-                if existing:
-                    skipped_count += 1
+            # Queue ranges not already assigned to this country (in the table or earlier in this run)
+            entry_inserted = 0
+            for start_code, end_code, start_index, end_index in intervals:
+                key = (start_index, end_index, country.id)
+                if key in existing_ranges:
+                    progress.count('skipped')
                     continue
                 
-                # Create new WMI country code
-                wmi_code = WmiCountryCode(
-                    code=code,
-                    country_id=country.id
-                )
-                
-                db.session.add(wmi_code)
-                inserted_count += 1
+                existing_ranges.add(key)
+                new_rows.append({
+                    'start_code': start_code,
+                    'end_code': end_code,
+                    'start_index': start_index,
+                    'end_index': end_index,
+                    'country_id': country.id
+                })
+                entry_inserted += 1
             
-            print(f"  ✓ Inserted {len(codes)} codes for {country.common_name}")
+            progress.count('inserted', entry_inserted)
+            progress.debug(f"  ✓ Queued {entry_inserted} new ranges for {country.common_name}")
+        
+        # Write every new range with a single executemany
+        if new_rows:
+            execute_batched(db.insert(WmiCountryRange), new_rows)
         
         # Commit all changes
         db.session.commit()
         
-        print("="*60)
-        print(f"✅ Successfully seeded {inserted_count} WMI country codes!")
-        print(f"⊘ Skipped {skipped_count} entries")
+        progress.info("="*60)
+        progress.info(f"✅ Successfully seeded {progress.counts['inserted']} WMI country code ranges!")
+        progress.info(f"⊘ Skipped {progress.counts['skipped']} entries")
+        progress.print_errors()
         
-        if errors:
-            print(f"\n⚠ {len(errors)} errors encountered:")
-            for error in errors[:5]:  # Show first 5 errors
-                print(f"  {error}")
-            if len(errors) > 5:
-                print(f"  ... and {len(errors) - 5} more")
+        if owns_resolver:
+            resolver.print_unresolved_summary()
         
-        print("="*60)
+        progress.info("="*60)
         
     except FileNotFoundError:
-        print("❌ Error: ./json/wmi_country_codes.json not found")
-        print("Please make sure the file exists in the json directory")
+        progress.error(f"❌ Error: {WMI_COUNTRY_CODES_FILE} not found\n"
+                       "Please make sure the file exists in the json directory")
     except json.JSONDecodeError as e:
-        print(f"❌ Error parsing JSON: {e}")
+        progress.error(f"❌ Error parsing JSON: {e}")
     except Exception as e:
-        print(f"❌ Error processing data: {e}")
+        progress.error(f"❌ Error processing data: {e}")
         db.session.rollback()
-        raise
\ No newline at end of file
+        raise
+    finally:
+        progress.finish()
\ No newline at end of file
@@ -1,19 +1,18 @@
 import json
 import re
-from models.country import WmiFactoryCode, WmiCountryCode, db
-from utils import find_country_by_name
+from collections import namedtuple
+from models.country import Country, WmiFactoryCode, WmiCountryRange, db
+from utils.wmi_ranges import VIN_CHARACTERS, CHARACTER_INDEX, RangeTable, warn
+from utils.seed_profile import execute_batched
+from utils.progress import ProgressReporter
+from utils.parallel import parallel_map, wait_for
 
-# Valid VIN characters in order (excluding I, O, Q)
-VIN_CHARACTERS = [
-    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'J', 'K', 'L', 'M', 
-    'N', 'P', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
-    '1', '2', '3', '4', '5', '6', '7', '8', '9', '0'
-]
+WMI_FACTORY_CODES_FILE = "./json/wmi_factory_codes.json"
 
-
-def expand_wmi_range(range_str):
+def expand_wmi_range(range_str, warnings=None):
     """
     Expand WMI range into individual 3-character codes.
+    Format problems are appended to warnings if given, else logged.
     Examples:
         'JHF-JHG' -> ['JHF', 'JHG']
         'JH1-JH5' -> ['JH1', 'JH2', 'JH3', 'JH4', 'JH5']
@@ -34,27 +33,27 @@ def expand_wmi_range(range_str):
             end_third = end[2]
             
             try:
-                start_idx = VIN_CHARACTERS.index(start_third)
-                end_idx = VIN_CHARACTERS.index(end_third)
+                start_idx = CHARACTER_INDEX[start_third]
+                end_idx = CHARACTER_INDEX[end_third]
                 
                 for i in range(start_idx, end_idx + 1):
                     codes.append(prefix + VIN_CHARACTERS[i])
-            except ValueError:
-                print(f"⚠ Invalid character in range '{range_str}'")
+            except KeyError:
+                warn(f"⚠ Invalid character in range '{range_str}'", warnings)
         else:
-            print(f"⚠ Invalid range format '{range_str}'")
+            warn(f"⚠ Invalid range format '{range_str}'", warnings)
     
     # Single 3-character code
     elif len(range_str) == 3:
         codes.append(range_str)
     
     else:
-        print(f"⚠ Unknown WMI range format: '{range_str}'")
+        warn(f"⚠ Unknown WMI range format: '{range_str}'", warnings)
     
     return codes
 
 
-def parse_complex_wmi(wmi_str):
+def parse_complex_wmi(wmi_str, warnings=None):
     """
     Parse complex WMI strings with multiple ranges and codes.
     Example: 'JHF-JHG, JHL-JHN, JHZ, JH1-JH5'
@@ -65,149 +64,215 @@ def parse_complex_wmi(wmi_str):
     parts = [p.strip() for p in wmi_str.split(',')]
     
     for part in parts:
-        codes = expand_wmi_range(part)
+        codes = expand_wmi_range(part, warnings)
         all_codes.extend(codes)
     
     return all_codes
 
 
-def seed_wmi_factory_codes():
-    """Seed WMI factory codes from JSON file"""
+ParsedFactoryEntry = namedtuple('ParsedFactoryEntry', [
+    'wmi_raw', 'manufacturer', 'wmi_codes', 'error', 'warnings'
+])
+
+
+def parse_factory_entry(entry):
+    """
+    Parse and expand one factory code entry into a ParsedFactoryEntry.
+    Touches no database, so it can run in a worker process; error is set
+    when the entry yields no codes.
+    """
+    warnings = []
+    wmi_raw = entry.get('WMI', '').strip()
+    manufacturer = entry.get('Manufacturer', '').strip()
+    
+    if not manufacturer:
+        return ParsedFactoryEntry(wmi_raw, manufacturer, [], f"⚠ No manufacturer name for WMI: {wmi_raw}", warnings)
+    
+    # Handle complex WMI codes (ranges, commas, slashes)
+    wmi_codes = []
+    
+    # Check if it's a complex range (contains comma or hyphen with letters)
+    if ',' in wmi_raw or re.search(r'[A-Z0-9]{3}-[A-Z0-9]{3}', wmi_raw):
+        wmi_codes = parse_complex_wmi(wmi_raw, warnings)
+    # Handle slash-separated WMI codes
+    elif '/' in wmi_raw:
+        parts = [p.strip() for p in wmi_raw.split('/')]
+        for part in parts:
+            if part and len(part) == 3:
+                wmi_codes.append(part)
+            elif part:
+                # Try to parse as complex range
+                wmi_codes.extend(parse_complex_wmi(part, warnings))
+    # Simple single WMI code
+    elif len(wmi_raw) == 3:
+        wmi_codes.append(wmi_raw)
+    else:
+        return ParsedFactoryEntry(wmi_raw, manufacturer, [], f"⚠ Invalid WMI format: '{wmi_raw}'", warnings)
+    
+    if not wmi_codes:
+        return ParsedFactoryEntry(wmi_raw, manufacturer, [], f"⚠ No valid codes from: '{wmi_raw}'", warnings)
+    
+    return ParsedFactoryEntry(wmi_raw, manufacturer, wmi_codes, None, warnings)
+
+
+def load_factory_entries(path=WMI_FACTORY_CODES_FILE, workers=None):
+    """Read a factory code file and parse its entries in a worker pool (in file order)"""
+    with open(path, "r", encoding="utf-8") as f:
+        factory_data = json.load(f)
+    return parallel_map(parse_factory_entry, factory_data, workers)
+
+
+# List of known regions (not countries)
+KNOWN_REGIONS = ['Africa', 'Asia', 'Europe', 'North America', 'South America', 'Oceania']
+
+
+def load_prefix_countries():
+    """
+    Map each 2-character WMI prefix to (country_id, common_name) in one query.
+    Where ranges overlap, the lowest country_id wins (as in the decoder).
+    """
+    rows = (db.session.query(WmiCountryRange.start_index, WmiCountryRange.end_index,
+                             Country.id, Country.common_name)
+            .join(Country, WmiCountryRange.country_id == Country.id)).all()
+    names = {country_id: common_name for _, _, country_id, common_name in rows}
+    table = RangeTable([(start, end, country_id) for start, end, country_id, _ in rows], width=2)
+    return {code: (country_id, names[country_id]) for code, country_id in table.items()}
+
+
+def load_existing_factories():
+    """Map each WMI already in the table to its row values and location name"""
+    rows = (db.session.query(WmiFactoryCode.id, WmiFactoryCode.wmi, WmiFactoryCode.manufacturer,
+                             WmiFactoryCode.region, Country.common_name)
+            .outerjoin(Country, WmiFactoryCode.country_id == Country.id))
+    return {
+        wmi: {
+            'id': factory_id,
+            'manufacturer': manufacturer,
+            'location': common_name or region or "Unknown"
+        }
+        for factory_id, wmi, manufacturer, region, common_name in rows
+    }
+
+
+def seed_wmi_factory_codes(parsed=None, workers=None):
+    """
+    Seed WMI factory codes from JSON file.
+    parsed is the result of load_factory_entries (or a Future of it) when the
+    file was already parsed concurrently; otherwise it is parsed here.
+    """
     
-    print("\n📥 Loading WMI factory codes from ./json/wmi_factory_codes.json...")
+    progress = ProgressReporter('seed_wmi_factory_codes')
+    progress.info(f"\n📥 Loading WMI factory codes from {WMI_FACTORY_CODES_FILE}...")
     
     try:
-        with open("./json/wmi_factory_codes.json", "r", encoding="utf-8") as f:
-            factory_data = json.load(f)
+        if parsed is None:
+            parsed = load_factory_entries(workers=workers)
+        parsed = wait_for(parsed)
         
-        print("✓ Loaded WMI factory codes data")
-        print("💾 Processing and inserting into database...")
+        progress.total = len(parsed)
+        progress.info("✓ Loaded WMI factory codes data")
+        progress.info("💾 Processing and inserting into database...")
         
-        inserted_count = 0
-        updated_count = 0
-        skipped_count = 0
-        errors = []
+        # Resolve prefixes and existing WMIs from memory instead of per-code queries
+        prefix_countries = load_prefix_countries()
+        factories = load_existing_factories()
+        new_factories = {}
         
-        for entry in factory_data:
-            wmi_raw = entry.get('WMI', '').strip()
-            manufacturer = entry.get('Manufacturer', '').strip()
+        for parsed_entry in parsed:
+            progress.advance()
+            for warning in parsed_entry.warnings:
+                progress.warning(warning)
             
-            if not manufacturer:
-                error_msg = f"⚠ No manufacturer name for WMI: {wmi_raw}"
-                print(error_msg)
-                errors.append(error_msg)
-                skipped_count += 1
+            if parsed_entry.error:
+                progress.record_error(parsed_entry.error)
+                if not parsed_entry.manufacturer:
+                    progress.count('skipped')
                 continue
             
-            # Handle complex WMI codes (ranges, commas, slashes)
-            wmi_codes = []
-            
-            # Check if it's a complex range (contains comma or hyphen with letters)
-            if ',' in wmi_raw or re.search(r'[A-Z0-9]{3}-[A-Z0-9]{3}', wmi_raw):
-                wmi_codes = parse_complex_wmi(wmi_raw)
-            # Handle slash-separated WMI codes
-            elif '/' in wmi_raw:
-                parts = [p.strip() for p in wmi_raw.split('/')]
-                for part in parts:
-                    if part and len(part) == 3:
-                        wmi_codes.append(part)
-                    elif part:
-                        # Try to parse as complex range
-                        wmi_codes.extend(parse_complex_wmi(part))
-            # Simple single WMI code
-            elif len(wmi_raw) == 3:
-                wmi_codes.append(wmi_raw)
-            else:
-                error_msg = f"⚠ Invalid WMI format: '{wmi_raw}'"
-                print(error_msg)
-                errors.append(error_msg)
-                continue
-            
-            if not wmi_codes:
-                error_msg = f"⚠ No valid codes from: '{wmi_raw}'"
-                print(error_msg)
-                errors.append(error_msg)
-                continue
+            manufacturer = parsed_entry.manufacturer
             
             # Process each WMI code
-            for wmi in wmi_codes:
+            for wmi in parsed_entry.wmi_codes:
                 if len(wmi) != 3:
-                    error_msg = f"⚠ Invalid WMI code length: '{wmi}'"
-                    errors.append(error_msg)
+                    progress.record_error(f"⚠ Invalid WMI code length: '{wmi}'", quiet=True)
                     continue
                 
-                # Extract first 2 characters to look up country
-                country_code = wmi[:2]
-                
-                # Find the country by looking up the country code in wmi_country_codes
-                country_code_entry = WmiCountryCode.query.filter_by(code=country_code).first()
-                
-                country = None
-                region = None
-                
-                if country_code_entry:
-                    # Check if it's a country or region
-                    country_name = country_code_entry.country.common_name
-                    
-                    # List of known regions (not countries)
-                    known_regions = ['Africa', 'Asia', 'Europe', 'North America', 'South America', 'Oceania']
-                    
-                    if country_name in known_regions:
-                        region = country_name
-                    else:
-                        country = country_code_entry.country
-                
-                # Check if this WMI already exists
-                existing = WmiFactoryCode.query.filter_by(wmi=wmi).first()
+                existing = factories.get(wmi)
                 
                 if existing:
                     # Merge manufacturer names
-                    if manufacturer not in existing.manufacturer:
-                        existing.manufacturer = f"{existing.manufacturer} & {manufacturer}"
-                        db.session.add(existing)
-                        location = existing.country.common_name if existing.country else existing.region or "Unknown"
-                        print(f"  ⟳ Updated {wmi} -> {existing.manufacturer[:50]}... ({location})")
-                        updated_count += 1
+                    if manufacturer not in existing['manufacturer']:
+                        existing['manufacturer'] = f"{existing['manufacturer']} & {manufacturer}"
+                        existing['changed'] = True
+                        progress.debug(f"  ⟳ Updated {wmi} -> {existing['manufacturer'][:50]}... ({existing['location']})")
+                        progress.count('updated')
                     else:
-                        skipped_count += 1
+                        progress.count('skipped')
                     continue
                 
-                # Create new WMI factory code
-                factory_code = WmiFactoryCode(
-                    wmi=wmi,
-                    manufacturer=manufacturer,
-                    country_id=country.id if country else None,
-                    region=region
-                )
+                # Find the country from the first 2 characters (country or region)
+                country_id = None
+                region = None
+                country_code_entry = prefix_countries.get(wmi[:2])
                 
-                db.session.add(factory_code)
-                location = country.common_name if country else region or "No Region/Country"
-                print(f"  ✓ {wmi} -> {manufacturer[:50]}... ({location})")
-                inserted_count += 1
+                if country_code_entry:
+                    if country_code_entry[1] in KNOWN_REGIONS:
+                        region = country_code_entry[1]
+                    else:
+                        country_id = country_code_entry[0]
+                
+                location = country_code_entry[1] if country_id else region or "No Region/Country"
+                factory = {
+                    'id': None,
+                    'manufacturer': manufacturer,
+                    'country_id': country_id,
+                    'region': region,
+                    'location': country_code_entry[1] if country_id else region or "Unknown"
+                }
+                factories[wmi] = factory
+                new_factories[wmi] = factory
+                progress.debug(f"  ✓ {wmi} -> {manufacturer[:50]}... ({location})")
+                progress.count('inserted')
         
-        # Commit all changes
-        db.session.commit()
+        # Flush everything with one bulk insert and one bulk update
+        new_rows = [
+            {
+                'wmi': wmi,
+                'manufacturer': factory['manufacturer'],
+                'country_id': factory['country_id'],
+                'region': factory['region']
+            }
+            for wmi, factory in new_factories.items()
+        ]
+        if new_rows:
+            execute_batched(db.insert(WmiFactoryCode), new_rows)
         
-        print("="*60)
-        print(f"✅ Successfully seeded {inserted_count} WMI factory codes!")
-        print(f"⟳ Updated {updated_count} existing codes with merged manufacturers")
-        print(f"⊘ Skipped {skipped_count} entries")
+        changed_rows = [
+            {'id': factory['id'], 'manufacturer': factory['manufacturer']}
+            for factory in factories.values()
+            if factory['id'] is not None and factory.get('changed')
+        ]
+        if changed_rows:
+            execute_batched(db.update(WmiFactoryCode), changed_rows)
         
-        if errors:
-            print(f"\n⚠ {len(errors)} errors encountered:")
-            for error in errors[:10]:  # Show first 10 errors
-                print(f"  {error}")
-            if len(errors) > 10:
-                print(f"  ... and {len(errors) - 10} more")
+        # Commit all changes
+        db.session.commit()
         
-        print("="*60)
+        progress.info("="*60)
+        progress.info(f"✅ Successfully seeded {progress.counts['inserted']} WMI factory codes!")
+        progress.info(f"⟳ Updated {progress.counts['updated']} existing codes with merged manufacturers")
+        progress.info(f"⊘ Skipped {progress.counts['skipped']} entries")
+        progress.print_errors(limit=10)
+        progress.info("="*60)
         
     except FileNotFoundError:
-        print("❌ Error: ./json/wmi_factory_codes.json not found")
-        print("Please make sure the file exists in the json directory")
+        progress.error(f"❌ Error: {WMI_FACTORY_CODES_FILE} not found\n"
+                       "Please make sure the file exists in the json directory")
     except json.JSONDecodeError as e:
-        print(f"❌ Error parsing JSON: {e}")
+        progress.error(f"❌ Error parsing JSON: {e}")
     except Exception as e:
-        print(f"❌ Error processing data: {e}")
+        progress.error(f"❌ Error processing data: {e}")
         db.session.rollback()
-        raise
\ No newline at end of file
+        raise
+    finally:
+        progress.finish()
\ No newline at end of file
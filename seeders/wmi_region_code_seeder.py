@@ -1,81 +1,103 @@
 import json
 from models.country import WmiRegionCode, db
-from utils import find_country_by_name
+from utils import CountryResolver
+from utils.seed_profile import execute_batched
+from utils.progress import ProgressReporter
+from utils.parallel import wait_for
 
+WMI_REGION_CODES_FILE = "./json/wmi_region_codes.json"
 
-def seed_wmi_region_codes():
-    """Seed WMI region codes from JSON file"""
+
+def load_region_code_entries(path=WMI_REGION_CODES_FILE):
+    """Read a region code file as (region, code, country names) entries in file order"""
+    with open(path, "r", encoding="utf-8") as f:
+        wmi_data = json.load(f)
+    return [
+        (region, code, countries)
+        for region, codes in wmi_data.items()
+        for code, countries in codes.items()
+    ]
+
+
+def seed_wmi_region_codes(resolver=None, parsed=None):
+    """
+    Seed WMI region codes from JSON file.
+    Pass a CountryResolver to share one country name index across seeders,
+    and the result of load_region_code_entries (or a Future of it) if the
+    file was already read concurrently.
+    """
     
-    print("\n📥 Loading WMI region codes from ./json/wmi_region_codes.json...")
+    progress = ProgressReporter('seed_wmi_region_codes', unit='codes')
+    progress.info(f"\n📥 Loading WMI region codes from {WMI_REGION_CODES_FILE}...")
     
     try:
-        with open("./json/wmi_region_codes.json", "r", encoding="utf-8") as f:
-            wmi_data = json.load(f)
+        if parsed is None:
+            parsed = load_region_code_entries()
+        parsed = wait_for(parsed)
         
-        print("✓ Loaded WMI region codes data")
-        print("💾 Processing and inserting into database...")
+        progress.total = len(parsed)
+        progress.info("✓ Loaded WMI region codes data")
+        progress.info("💾 Processing and inserting into database...")
         
-        inserted_count = 0
-        skipped_count = 0
-        errors = []
+        owns_resolver = resolver is None
+        if owns_resolver:
+            resolver = CountryResolver.load()
         
-        for region, codes in wmi_data.items():
-            print(f"\n🌍 Processing region: {region}")
+        # One up-front read of the (code, country_id) pairs already in the table
+        existing_pairs = set(db.session.query(WmiRegionCode.code, WmiRegionCode.country_id))
+        new_rows = []
+        
+        current_region = None
+        for region, code, countries in parsed:
+            if region != current_region:
+                current_region = region
+                progress.debug(f"\n🌍 Processing region: {region}")
             
-            for code, countries in codes.items():
-                for country_name in countries:
-                    # Find the country in the database
-                    country = find_country_by_name(country_name)
-                    
-                    if not country:
-                        error_msg = f"⚠ Country not found: {country_name} (code: {code})"
-                        print(error_msg)
-                        errors.append(error_msg)
-                        skipped_count += 1
-                        continue
-                    
-                    # Check if this WMI code already exists for this country
-                    existing = WmiRegionCode.query.filter_by(
-                        code=code,
-                        country_id=country.id
-                    ).first()
-                    
-                    if existing:
-                        skipped_count += 1
-                        continue
-                    
-                    # Create new WMI region code
-                    wmi_code = WmiRegionCode(
-                        code=code,
-                        country_id=country.id
-                    )
-                    
-                    db.session.add(wmi_code)
-                    print(f"  ✓ {code} -> {country.common_name}")
-                    inserted_count += 1
+            progress.advance()
+            for country_name in countries:
+                # Find the country in the database
+                country = resolver.resolve(country_name)
+                
+                if not country:
+                    progress.record_error(f"⚠ Country not found: {country_name} (code: {code})")
+                    progress.count('skipped')
+                    continue
+                
+                # Check if this WMI code already exists for this country
+                pair = (code, country.id)
+                if pair in existing_pairs:
+                    progress.count('skipped')
+                    continue
+                
+                # Queue new WMI region code
+                existing_pairs.add(pair)
+                new_rows.append({'code': code, 'country_id': country.id})
+                progress.debug(f"  ✓ {code} -> {country.common_name}")
+                progress.count('inserted')
+        
+        execute_batched(db.insert(WmiRegionCode), new_rows)
         
         # Commit all changes
         db.session.commit()
         
-        print("="*60)
-        print(f"✅ Successfully seeded {inserted_count} WMI region codes!")
-        print(f"⊘ Skipped {skipped_count} entries")
+        progress.info("="*60)
+        progress.info(f"✅ Successfully seeded {progress.counts['inserted']} WMI region codes!")
+        progress.info(f"⊘ Skipped {progress.counts['skipped']} entries")
+        progress.print_errors()
         
-        if errors:
-            print(f"\n⚠ {len(errors)} errors encountered:")
-            for error in errors[:5]:  # Show first 5 errors
-                print(f"  {error}")
-            if len(errors) > 5:
-                print(f"  ... and {len(errors) - 5} more")
+        if owns_resolver:
+            resolver.print_unresolved_summary()
         
-        print("="*60)
+        progress.info("="*60)
         
     except FileNotFoundError:
-        print("❌ Error: ./json/wmi_region_codes.json not found")
-        print("Please make sure the file exists in the json directory")
+        progress.error(f"❌ Error: {WMI_REGION_CODES_FILE} not found\n"
+                       "Please make sure the file exists in the json directory")
     except json.JSONDecodeError as e:
-        print(f"❌ Error parsing JSON: {e}")
+        progress.error(f"❌ Error parsing JSON: {e}")
     except Exception as e:
-        print(f"❌ Error processing data: {e}")
+        progress.error(f"❌ Error processing data: {e}")
         db.session.rollback()
-        raise
\ No newline at end of file
+        raise
+    finally:
+        progress.finish()
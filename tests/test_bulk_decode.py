@@ -0,0 +1,28 @@
+import io
+
+import bulk_decode
+
+
+def test_malformed_ndjson_lines_become_error_records():
+    stream = io.StringIO('{"vin": "1HGCM82633A004352"}\n'
+                         '{"vin": "1HG\n'
+                         '\n'
+                         '"JHMCM56557C404453"\n'
+                         'not json\n'
+                         '{"vin": null}\n')
+
+    items = list(bulk_decode.read_vins(stream, 'ndjson', 'vin'))
+
+    assert items == [
+        '1HGCM82633A004352',
+        {'input': '{"vin": "1HG', 'error': 'Line 2: invalid JSON (Unterminated string starting at)'},
+        'JHMCM56557C404453',
+        {'input': 'not json', 'error': 'Line 5: invalid JSON (Expecting value)'},
+        '',
+    ]
+
+
+def test_error_records_pass_through_decoding():
+    record = {'input': 'not json', 'error': 'Line 5: invalid JSON (Expecting value)'}
+
+    assert bulk_decode.decode_chunk([record]) == [record]
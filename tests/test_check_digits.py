@@ -0,0 +1,73 @@
+"""
+compute_check_digits must match compute_check_digit / validate_check_digit
+bit for bit, on the NumPy path and on the pure Python fallback.
+"""
+import random
+
+import pytest
+
+import vin_app
+
+VINS = [
+    '1HGCM82633A004352',  # valid check digit
+    '1HGCM82643A004352',  # wrong check digit
+    '11111111111111111',  # check digit 1
+    '1M8GDM9AXKP042788',  # check digit X
+    '1hgcm82633a004352',  # lowercase (not transliterated)
+    '1HGCM82633A00435O',  # I, O and Q are not VIN characters
+    'IIIIIIIIOOOOOOQQQ',
+    '1HG-M826#3A004352',  # punctuation
+    '1HGCM8263\u00e9A004352',  # non-ASCII after the check digit
+    '1HGCM826\u00e93A004352',  # non-ASCII as the check digit
+    '\u00c5\u00c5\u00c5CM82633A004352',
+    '\U0001F697HGCM82633A004352',  # astral character, one code point
+    '',  # invalid lengths
+    'SHORT',
+    '1HGCM82633A0043521',
+    '1HGCM82633A00435\u00e9\u00e9',
+]
+
+
+def random_vins(count, seed=5):
+    rng = random.Random(seed)
+    alphabet = vin_app.VIN_CHARACTERS + 'ioqIOQ-_ éß'
+    return [''.join(rng.choices(alphabet, k=rng.choice((16, 17, 17, 17, 18)))) for _ in range(count)]
+
+
+def expected(vins):
+    check_digits = []
+    valid_flags = []
+    for vin in vins:
+        if len(vin) != vin_app.VIN_LENGTH:
+            check_digits.append('')
+            valid_flags.append(False)
+        else:
+            check_digits.append(vin_app.compute_check_digit(vin))
+            valid_flags.append(vin_app.validate_check_digit(vin))
+    return check_digits, valid_flags
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def path(request, monkeypatch):
+    """Run a test on the NumPy path and again with NumPy treated as missing"""
+    if request.param == 'numpy':
+        if vin_app.np is None:
+            pytest.skip('NumPy is not installed')
+    else:
+        monkeypatch.setattr(vin_app, 'np', None)
+    return request.param
+
+
+@pytest.mark.parametrize('vins', [VINS, random_vins(2000), []], ids=['edge_cases', 'random', 'empty'])
+def test_batch_matches_scalar(path, vins):
+    check_digits, valid_flags = vin_app.compute_check_digits(vins)
+
+    assert [str(digit) for digit in check_digits] == expected(vins)[0]
+    assert [bool(flag) for flag in valid_flags] == expected(vins)[1]
+
+
+def test_batch_accepts_iterators(path):
+    check_digits, valid_flags = vin_app.compute_check_digits(iter(VINS))
+
+    assert [str(digit) for digit in check_digits] == expected(VINS)[0]
+    assert [bool(flag) for flag in valid_flags] == expected(VINS)[1]
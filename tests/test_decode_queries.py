@@ -0,0 +1,114 @@
+"""
+decode_vin with preloading and caching off must cost exactly one SQL statement,
+whether or not match_logos.py has created factory_logos.
+"""
+import sqlite3
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+import match_logos
+import vin_app
+from models.country import db, Country, WmiRegionCode, WmiCountryRange, WmiFactoryCode
+from utils.lru_cache import LRUCache
+from utils.wmi_ranges import code_index
+
+VIN = '1HGCM82633A004352'
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """
+    A tiny seeded database of its own (region 1, country range 1A-1Z, factory 1HG),
+    with an app context pushed, preloading off and both cache tiers disabled
+    """
+    path = str(tmp_path / 'vin.db')
+    test_app = Flask('vin_test', instance_path=str(tmp_path))
+    test_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    test_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(test_app)
+
+    monkeypatch.setitem(vin_app.app.config, 'WMI_PRELOAD', False)
+    monkeypatch.setattr(vin_app, 'decode_cache', LRUCache(0))
+    monkeypatch.setattr(vin_app, 'wmi_cache', LRUCache(0))
+    monkeypatch.setattr(vin_app, '_has_factory_logos', None)
+    monkeypatch.setattr(match_logos, 'DB_PATH', path)
+
+    with test_app.app_context():
+        db.create_all()
+        usa = Country(iso_alpha2='US', iso_alpha3='USA', name='United States of America',
+                      common_name='United States', region='Americas', flag_emoji='🇺🇸')
+        db.session.add(usa)
+        db.session.flush()
+        db.session.add_all([
+            WmiRegionCode(code='1', country_id=usa.id),
+            WmiCountryRange(start_code='1A', end_code='1Z', start_index=code_index('1A'),
+                            end_index=code_index('1Z'), country_id=usa.id),
+            WmiFactoryCode(wmi='1HG', manufacturer='Honda of America Mfg.', country_id=usa.id),
+        ])
+        db.session.commit()
+
+        yield path
+
+        db.session.remove()
+        db.engine.dispose()
+
+
+def add_factory_logo(filename):
+    """Create factory_logos the way match_logos.py does and give 1HG a logo"""
+    conn = match_logos.setup_database()
+    conn.execute(
+        "INSERT OR IGNORE INTO factory_logos (factory_id, logo_filename) "
+        "SELECT id, ? FROM wmi_factory_codes WHERE wmi = '1HG'", (filename,))
+    conn.commit()
+    conn.close()
+
+
+def has_table(path, name):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                            (name,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def count_statements(func, *args):
+    """Return func(*args) and the statements it sent to the database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = func(*args)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return result, statements
+
+
+def test_decode_without_factory_logos_is_one_statement(db_path):
+    assert not has_table(db_path, 'factory_logos')
+    # The table check runs once per seed, not per decode
+    vin_app.has_factory_logos()
+
+    result, statements = count_statements(vin_app.decode_vin, VIN)
+
+    assert len(statements) == 1, statements
+    assert result['manufacturer'] == 'Honda of America Mfg.'
+    assert result['country'] == 'United States'
+    assert result['manufacturer_logos'] == []
+
+
+def test_decode_with_factory_logos_is_one_statement(db_path):
+    add_factory_logo('honda.png')
+    assert has_table(db_path, 'factory_logos')
+    vin_app.has_factory_logos()
+
+    result, statements = count_statements(vin_app.decode_vin, VIN)
+
+    assert len(statements) == 1, statements
+    assert result['manufacturer'] == 'Honda of America Mfg.'
+    assert result['manufacturer_logos'] == ['honda.png']
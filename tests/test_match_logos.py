@@ -0,0 +1,105 @@
+"""
+The token index matcher must return exactly what the original matcher did:
+one whole-word regex (\\b...\\b) search per logo and factory pair.
+"""
+import random
+import re
+
+import pytest
+
+import match_logos
+
+
+def regex_find_matches(logos, factories):
+    """The original find_matches, kept as the reference implementation"""
+    matches = []
+
+    for logo in logos:
+        logo_matches = []
+        logo_normalized = logo['normalized']
+
+        # Skip very short brand names (2 chars or less) to avoid false positives
+        if len(logo_normalized) <= 2:
+            continue
+
+        for factory in factories:
+            factory_normalized = factory['normalized']
+
+            pattern = r'\b' + re.escape(logo_normalized) + r'\b'
+            if re.search(pattern, factory_normalized):
+                logo_matches.append(factory['id'])
+
+        if logo_matches:
+            matches.append({
+                'logo': logo,
+                'factory_ids': logo_matches,
+                'match_count': len(logo_matches)
+            })
+
+    return matches
+
+
+def make_logos(brands):
+    """Logo entries the way get_logo_files builds them from brand_name.png files"""
+    logos = []
+    for brand in brands:
+        filename = f"{brand.lower().replace(' ', '_')}.png"
+        brand_name = filename[:-4].replace('_', ' ')
+        logos.append({'filename': filename, 'brand_name': brand_name,
+                      'normalized': match_logos.normalize_name(brand_name)})
+    return logos
+
+
+def make_factories(names):
+    return [{'id': i + 1, 'name': name, 'normalized': match_logos.normalize_name(name)}
+            for i, name in enumerate(names)]
+
+
+BRANDS = [
+    # Multi-word brands
+    'Land Rover', 'Alfa Romeo', 'Aston Martin', 'Great Wall', 'General Motors',
+    # Punctuation and hyphens
+    'Mercedes-Benz', 'Rolls-Royce', 'Citroën', 'Škoda', 'Ssang-Yong', 'Dr. Motor', 'A.C.',
+    # Brands overlapping each other or other words
+    'Rover', 'Mini', 'Mini Cooper', 'Ford', 'Ford Motor', 'Motor', 'Kia', 'Kiawah',
+    'Honda', 'Hond', 'Smart', 'Smartcar', 'Lotus', 'Lotus Cars', 'Cars',
+    # Digits and too-short names
+    'DS', 'MG', 'BYD', 'GAC', '3M', 'Brand 2000',
+]
+
+FACTORIES = [
+    'Land Rover', 'Rover Group Ltd', 'Land Rover (Rover Group)', 'Alfa Romeo S.p.A.',
+    'Aston Martin Lagonda Ltd', 'Great Wall Motor Company', 'General Motors de Mexico',
+    'Mercedes-Benz AG', 'Mercedes Benz USA', 'Rolls-Royce Motor Cars', 'Rolls Royce',
+    'Citroën SA', 'Citroen', 'Škoda Auto', 'SsangYong Motor', 'Ssang-Yong', 'Dr. Motor Company',
+    'A.C. Cars', 'AC Cars', 'Mini Cooper plant', 'BMW (Mini)', 'Ford Motor Company',
+    'Ford-Werke GmbH', 'Ford Ford Motor Motor', 'Kia Motors', 'Kiawah Island Motors',
+    'Honda of America Mfg.', 'Hondamatic', 'Smart gmbh', 'Smartcar', 'Lotus Cars Ltd',
+    'DS Automobiles', 'MG Motor UK', 'BYD Auto', 'GAC Motor', '3M Company', 'Brand 2000 Inc',
+    'Brand 20000', '', '   ', 'Co', '(Limited)',
+]
+
+
+def assert_same_matches(logos, factories):
+    assert match_logos.find_matches(logos, factories) == regex_find_matches(logos, factories)
+
+
+def test_known_brands_match_like_the_regex_matcher():
+    logos = make_logos(BRANDS)
+    factories = make_factories(FACTORIES)
+
+    assert_same_matches(logos, factories)
+    # The fixtures do exercise matching, overlaps included
+    matched = {match['logo']['brand_name'] for match in regex_find_matches(logos, factories)}
+    assert {'land rover', 'rover', 'mini', 'mini cooper', 'ford', 'ford motor', 'motor'} <= matched
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_names_match_like_the_regex_matcher(seed):
+    rng = random.Random(seed)
+    words = ['auto', 'motor', 'motors', 'car', 'cars', 'land', 'rover', 'mini', 'ford', 'kia',
+             'mercedes', 'benz', 'mercedes-benz', '2000', 'x', 'ab', '(group)', 'ltd', 'the']
+    brands = [' '.join(rng.choices(words, k=rng.randint(1, 3))) for _ in range(40)]
+    factories = [' '.join(rng.choices(words, k=rng.randint(0, 6))) for _ in range(200)]
+
+    assert_same_matches(make_logos(brands), make_factories(factories))
@@ -0,0 +1,146 @@
+"""
+scrape_logos.py against a local stand-in for the logo site: downloads, conditional
+revalidation on the next run, resuming an interrupted run, and manifest batching.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import scrape_logos
+
+BRANDS = {
+    '/car-brands/': ['Alfa Romeo', 'Ford', 'Land Rover'],
+    '/car-brands/page-2.html': ['Toyota'],
+}
+
+
+def page_html(brands):
+    items = ''.join(f'<li><a href="/{brand}">{brand}<span>new</span></a>'
+                    f'<img src="/logos/{brand.replace(" ", "-")}.png"></li>' for brand in brands)
+    return f'<html><body><ul class="logo-list">{items}</ul></body></html>'.encode('utf-8')
+
+
+class StandInSite:
+    """Serves BRANDS pages and their images with ETags; records every request"""
+
+    def __init__(self):
+        self.requests = []
+        self.failing = set()  # Image paths answered with 404
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                conditional = self.headers.get('If-None-Match') is not None
+                site.requests.append((self.path, conditional))
+
+                if self.path.startswith('/car-brands/'):
+                    body = page_html(BRANDS.get(self.path, []))
+                    content_type = 'text/html'
+                elif self.path.startswith('/logos/') and self.path not in site.failing:
+                    body = f'PNG {self.path}'.encode('utf-8')
+                    content_type = 'image/png'
+                else:
+                    self.send_error(404)
+                    return
+
+                etag = f'"{len(body)}-{abs(hash(body))}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def image_requests(self):
+        return [(path, conditional) for path, conditional in self.requests if path.startswith('/logos/')]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape_logos, 'OUTPUT_DIR', str(tmp_path / 'brands'))
+    monkeypatch.setattr(scrape_logos, 'MANIFEST_PATH', str(tmp_path / 'scrape_manifest.json'))
+    site = StandInSite()
+    yield site
+    site.close()
+
+
+def run_scraper(site):
+    scrape_logos.main(base_url=site.url, workers=4, rate=0)
+    with open(scrape_logos.MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_downloads_every_logo(site, tmp_path):
+    manifest = run_scraper(site)
+
+    saved = sorted(path.name for path in (tmp_path / 'brands').iterdir())
+    assert saved == ['alfa_romeo.png', 'ford.png', 'land_rover.png', 'toyota.png']
+    assert (tmp_path / 'brands' / 'ford.png').read_bytes() == b'PNG /logos/Ford.png'
+    assert manifest['run']['complete']
+    assert sorted(manifest['images']) == saved
+    assert len(manifest['pages']) == scrape_logos.PAGE_COUNT
+
+
+def test_next_run_revalidates_instead_of_downloading(site):
+    run_scraper(site)
+    site.requests.clear()
+
+    run_scraper(site)
+
+    images = site.image_requests()
+    assert len(images) == 4
+    assert all(conditional for _, conditional in images)
+
+
+def test_interrupted_run_resumes_with_only_the_failed_requests(site, tmp_path):
+    site.failing.add('/logos/Toyota.png')
+    manifest = run_scraper(site)
+
+    assert not manifest['run']['complete']
+    assert not (tmp_path / 'brands' / 'toyota.png').exists()
+
+    site.failing.clear()
+    site.requests.clear()
+    manifest = run_scraper(site)
+
+    assert site.requests == [('/logos/Toyota.png', False)]
+    assert (tmp_path / 'brands' / 'toyota.png').exists()
+    assert manifest['run']['complete']
+
+
+def test_manifest_is_written_in_batches(tmp_path):
+    path = tmp_path / 'manifest.json'
+    manifest = scrape_logos.ScrapeManifest(str(path), save_every=3, save_interval=3600)
+    manifest.start_run()
+
+    manifest.record_image('a.png', 'http://example/a.png', {'etag': '"a"', 'last_modified': None})
+    manifest.record_image('b.png', 'http://example/b.png', {'etag': '"b"', 'last_modified': None})
+    assert json.loads(path.read_text())['run']['done'] == []
+
+    manifest.record_image('c.png', 'http://example/c.png', {'etag': '"c"', 'last_modified': None})
+    assert json.loads(path.read_text())['run']['done'] == ['a.png', 'b.png', 'c.png']
+
+    manifest.record_image('d.png', 'http://example/d.png', {'etag': '"d"', 'last_modified': None})
+    manifest.flush()
+    assert sorted(json.loads(path.read_text())['images']) == ['a.png', 'b.png', 'c.png', 'd.png']
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,25 @@
+from utils import progress
+from utils.wmi_ranges import parse_code_range
+
+
+def test_parse_code_range_collects_warnings():
+    warnings = []
+
+    intervals = parse_code_range('AA-AH, AI-AZ, ABC, A-BC, PV', warnings)
+
+    assert intervals == [('AA', 'AH'), ('PV', 'PV')]
+    assert warnings == [
+        "⚠ Invalid character in range 'AI-AZ'",
+        "⚠ Unknown range format: 'ABC'",
+        "⚠ Invalid range format 'A-BC': expected 2-char codes",
+    ]
+
+
+def test_parse_code_range_warnings_follow_verbosity(capsys, monkeypatch):
+    monkeypatch.setattr(progress, '_verbosity', progress.QUIET)
+    parse_code_range('ABC')
+    assert capsys.readouterr().out == ''
+
+    monkeypatch.setattr(progress, '_verbosity', progress.INFO)
+    parse_code_range('ABC')
+    assert capsys.readouterr().out == "⚠ Unknown range format: 'ABC'\n"
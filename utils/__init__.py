@@ -3,15 +3,28 @@ from .country_helpers import (
     get_calling_code,
     map_region,
     find_country_by_name,
+    normalize_country_name,
+    CountryResolver,
+    CountryRecord,
     COUNTRY_NAME_MAPPINGS
 )
-from .validators import validate_wmi_country_codes
+from .validators import validate_wmi_codes, print_validation_report
+from .wmi_lookup import WmiLookup, load_wmi_lookup
+from .wmi_snapshot import WmiSnapshot, compile_wmi_snapshot
 
 __all__ = [
     'get_first_value',
     'get_calling_code',
     'map_region',
     'find_country_by_name',
+    'normalize_country_name',
+    'CountryResolver',
+    'CountryRecord',
     'COUNTRY_NAME_MAPPINGS',
-    'validate_wmi_country_codes'
+    'validate_wmi_codes',
+    'print_validation_report',
+    'WmiLookup',
+    'load_wmi_lookup',
+    'WmiSnapshot',
+    'compile_wmi_snapshot'
 ]
\ No newline at end of file
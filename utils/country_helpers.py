@@ -1,4 +1,6 @@
+from collections import namedtuple
 from models.country import Country, db
+from .progress import log, INFO, WARNING
 
 
 # Country name variations and mappings for better matching
@@ -70,4 +72,100 @@ def find_country_by_name(country_name):
                 if country:
                     return country
     
-    return None
\ No newline at end of file
+    return None
+
+
+# Lightweight country row returned by CountryResolver (safe to use across commits)
+CountryRecord = namedtuple('CountryRecord', [
+    'id', 'iso_alpha2', 'iso_alpha3', 'name', 'common_name', 'region'
+])
+
+
+def normalize_country_name(name):
+    """Normalize a country name or alias for index lookups"""
+    return ' '.join((name or '').casefold().split())
+
+
+class CountryResolver:
+    """
+    In-memory country name index built once per seeding run.
+    Resolves common names first (like find_country_by_name), then
+    COUNTRY_NAME_MAPPINGS aliases, official names and ISO codes, in O(1).
+    Misses are memoized and reported together by print_unresolved_summary().
+    """
+
+    def __init__(self, countries):
+        self.by_common_name = {}
+        self.by_official_name = {}
+        self.by_iso_code = {}
+        self.first_by_region = {}
+
+        for country in sorted(countries, key=lambda c: c.id):
+            self._index(self.by_common_name, country.common_name, country)
+            self._index(self.by_official_name, country.name, country)
+            self._index(self.by_iso_code, country.iso_alpha2, country)
+            self._index(self.by_iso_code, country.iso_alpha3, country)
+            if country.region:
+                self.first_by_region.setdefault(country.region, country)
+
+        # Any variation -> all variations of its mapping, in mapping order
+        self.aliases = {}
+        for variations in COUNTRY_NAME_MAPPINGS.values():
+            for variation in variations:
+                self.aliases.setdefault(normalize_country_name(variation), variations)
+
+        self._resolved = {}
+        self.unresolved = {}
+
+    @staticmethod
+    def _index(index, name, country):
+        key = normalize_country_name(name)
+        if key:
+            index.setdefault(key, country)
+
+    @classmethod
+    def load(cls):
+        """Build the index from the countries table with one query"""
+        rows = db.session.query(
+            Country.id, Country.iso_alpha2, Country.iso_alpha3,
+            Country.name, Country.common_name, Country.region
+        )
+        return cls(CountryRecord(*row) for row in rows)
+
+    def _lookup(self, key):
+        country = self.by_common_name.get(key)
+        if country:
+            return country
+
+        for variation in self.aliases.get(key, ()):
+            country = self.by_common_name.get(normalize_country_name(variation))
+            if country:
+                return country
+
+        return self.by_official_name.get(key) or self.by_iso_code.get(key)
+
+    def resolve(self, country_name):
+        """Find a country by common name, alias, official name or ISO code"""
+        key = normalize_country_name(country_name)
+        if key in self._resolved:
+            country = self._resolved[key]
+        else:
+            country = self._resolved[key] = self._lookup(key)
+
+        if country is None:
+            self.unresolved[country_name] = self.unresolved.get(country_name, 0) + 1
+        return country
+
+    def first_in_region(self, region):
+        """First country (lowest id) in a region, used as a region placeholder"""
+        return self.first_by_region.get(region)
+
+    def print_unresolved_summary(self):
+        """Print every name that could not be resolved, once, with its count"""
+        if not self.unresolved:
+            log(INFO, "✅ All country names resolved")
+            return
+
+        log(WARNING, f"\n⚠ {len(self.unresolved)} country names could not be resolved:")
+        for name, count in sorted(self.unresolved.items()):
+            log(WARNING, f"  {name} ({count}x)")
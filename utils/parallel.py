@@ -0,0 +1,61 @@
+"""
+Worker pools for the CPU-bound parse/expand stage of seeding
+Parsing runs in processes (so large vendor lists use every core) while the
+database is only ever written from the main thread by the seeders.
+"""
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Below this many items a process pool costs more than it saves
+PARALLEL_MIN_ITEMS = 5000
+
+# Items handed to a worker per round trip
+PARALLEL_CHUNK_SIZE = 500
+
+# Workers start fresh interpreters: parse stages call parallel_map from threads while the
+# main thread holds an open SQLite connection, and forking a multithreaded process can
+# copy locks held by other threads into the child
+PROCESS_CONTEXT = multiprocessing.get_context('spawn')
+
+
+def worker_count(workers=None):
+    """Number of parse workers: workers if given, else one per CPU"""
+    if workers:
+        return max(1, workers)
+    return os.cpu_count() or 1
+
+
+def parallel_map(func, items, workers=None, min_items=PARALLEL_MIN_ITEMS):
+    """
+    Return [func(item) for item in items], computed in a process pool when
+    there is more than one worker and enough items. func must be a module-level
+    function (workers import its module); results keep the order of items.
+    """
+    items = list(items)
+    workers = worker_count(workers)
+    if workers == 1 or len(items) < min_items:
+        return [func(item) for item in items]
+
+    chunksize = max(1, min(PARALLEL_CHUNK_SIZE, len(items) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=PROCESS_CONTEXT) as pool:
+        return list(pool.map(func, items, chunksize=chunksize))
+
+
+def run_concurrently(*calls):
+    """
+    Start each (func, *args) call in its own thread and return their futures.
+    Used to load and parse independent seed files while earlier stages write.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(calls))
+    try:
+        return [pool.submit(func, *args) for func, *args in calls]
+    finally:
+        pool.shutdown(wait=False)
+
+
+def wait_for(value):
+    """The result of a Future from run_concurrently, or value itself if it is not one"""
+    if isinstance(value, Future):
+        return value.result()
+    return value
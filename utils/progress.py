@@ -0,0 +1,124 @@
+"""
+Shared progress reporting for the seeders
+Messages go through one verbosity level (debug shows per-row lines, quiet
+shows only errors), progress lines are rate-limited, and every reporter
+leaves a machine-readable summary of its counts and errors.
+"""
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+# Verbosity for quiet mode: errors only
+QUIET = ERROR
+
+# Minimum seconds between two progress lines of one reporter
+PROGRESS_INTERVAL = 1.0
+
+_verbosity = INFO
+_summaries = []
+
+
+def set_verbosity(level):
+    """Set the lowest level that is printed (DEBUG, INFO, WARNING or QUIET)"""
+    global _verbosity
+    _verbosity = level
+
+
+def get_verbosity():
+    return _verbosity
+
+
+def log(level, message):
+    """Print message if level is at or above the current verbosity"""
+    if level >= _verbosity:
+        print(message)
+
+
+def seed_summaries():
+    """Summaries of every reporter finished since the last reset, in order"""
+    return list(_summaries)
+
+
+def reset_summaries():
+    _summaries.clear()
+
+
+class ProgressReporter:
+    """Counts, rate-limited progress and levelled messages for one seeding stage"""
+
+    def __init__(self, stage, total=None, unit='entries', interval=PROGRESS_INTERVAL):
+        self.stage = stage
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.processed = 0
+        self.counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        self.errors = []
+        self.started = time.monotonic()
+        self._last_progress = self.started
+
+    def debug(self, message):
+        log(DEBUG, message)
+
+    def info(self, message):
+        log(INFO, message)
+
+    def warning(self, message):
+        log(WARNING, message)
+
+    def error(self, message):
+        """Print (even in quiet mode) and record a failure for the summary"""
+        self.errors.append(message)
+        log(ERROR, message)
+
+    def record_error(self, message, quiet=False):
+        """Record a problem with one entry for the summary, printed at warning level unless quiet"""
+        self.errors.append(message)
+        if not quiet:
+            log(WARNING, message)
+
+    def count(self, name, amount=1):
+        """Add to a counter ('inserted', 'updated', 'skipped' or any other name)"""
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def advance(self, amount=1):
+        """Mark entries as processed, printing a progress line at most once per interval"""
+        self.processed += amount
+        now = time.monotonic()
+        if now - self._last_progress < self.interval:
+            return
+        self._last_progress = now
+        if self.total:
+            log(INFO, f"  ⏳ {self.stage}: {self.processed}/{self.total} {self.unit} "
+                      f"({self.processed / self.total * 100:.0f}%)")
+        else:
+            log(INFO, f"  ⏳ {self.stage}: {self.processed} {self.unit}")
+
+    def print_errors(self, limit=5):
+        """Print the first errors at warning level"""
+        if not self.errors:
+            return
+        log(WARNING, f"\n⚠ {len(self.errors)} errors encountered:")
+        for error in self.errors[:limit]:
+            log(WARNING, f"  {error}")
+        if len(self.errors) > limit:
+            log(WARNING, f"  ... and {len(self.errors) - limit} more")
+
+    def summary(self):
+        return {
+            'stage': self.stage,
+            'processed': self.processed,
+            **self.counts,
+            'error_count': len(self.errors),
+            'errors': list(self.errors),
+            'seconds': round(time.monotonic() - self.started, 6)
+        }
+
+    def finish(self):
+        """Record the summary (see seed_summaries) and return it"""
+        summary = self.summary()
+        _summaries.append(summary)
+        return summary
@@ -0,0 +1,29 @@
+"""
+Seed stamp file written next to the database after every (re)seed
+Running decoders compare its timestamp to know when to drop cached WMI data
+"""
+import os
+import time
+
+SEED_STAMP_SUFFIX = '.seeded'
+
+
+def seed_stamp_path(db_path):
+    """Path of the stamp file for a database"""
+    return db_path + SEED_STAMP_SUFFIX
+
+
+def write_seed_stamp(db_path):
+    """Mark the database as freshly (re)seeded"""
+    path = seed_stamp_path(db_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"{time.time()}\n")
+    return path
+
+
+def read_seed_stamp(db_path):
+    """Return the stamp's modification time in ns, or None if never stamped"""
+    try:
+        return os.stat(seed_stamp_path(db_path)).st_mtime_ns
+    except OSError:
+        return None
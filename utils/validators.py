@@ -1,134 +1,243 @@
 """
 Validation utilities for WMI data
+Coverage of the 1-character region, 2-character country and 3-character
+factory code spaces is computed with bitmaps (Python ints, one bit per code
+in VIN_CHARACTERS order) and a counting array, so a full check takes
+milliseconds and never waits for input.
 """
-from models.country import WmiCountryCode, db
+from models.country import Country, WmiRegionCode, WmiCountryRange, WmiFactoryCode, db
+from .wmi_ranges import VIN_CHARACTERS, ALPHABET_SIZE, code_index, index_code, space_size
 
-# Valid VIN characters in order (excluding I, O, Q)
-VIN_CHARACTERS = [
-    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'J', 'K', 'L', 'M', 
-    'N', 'P', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
-    '1', '2', '3', '4', '5', '6', '7', '8', '9', '0'
-]
+# How many spans/codes each report section lists
+REPORT_SAMPLE_SIZE = 15
 
 
-def validate_wmi_country_codes():
+def span_mask(start, end):
+    """Bitmap with bits start..end (inclusive) set"""
+    return ((1 << (end - start + 1)) - 1) << start
+
+
+def mask_spans(mask):
+    """Yield (start, end) runs of set bits in a bitmap"""
+    offset = 0
+    while mask:
+        skip = (mask & -mask).bit_length() - 1
+        mask >>= skip
+        offset += skip
+        run = (mask ^ (mask + 1)).bit_length() - 1
+        yield offset, offset + run - 1
+        mask >>= run
+        offset += run
+
+
+def format_span(start, end, width):
+    if start == end:
+        return index_code(start, width)
+    return f"{index_code(start, width)}-{index_code(end, width)}"
+
+
+def check_region_codes():
+    """Coverage of the 1-character region space"""
+    total = space_size(1)
+    covered = 0
+    for (code,) in db.session.query(WmiRegionCode.code).distinct():
+        index = code_index(code) if len(code) == 1 else None
+        if index is not None:
+            covered |= 1 << index
+
+    missing = span_mask(0, total - 1) & ~covered
+    return {
+        'total': total,
+        'assigned': covered.bit_count(),
+        'coverage': covered.bit_count() / total,
+        'gaps': [format_span(start, end, 1) for start, end in mask_spans(missing)]
+    }, covered
+
+
+def check_country_ranges():
+    """Coverage, overlaps and gaps of the 2-character country space"""
+    total = space_size(2)
+
+    # One bitmap per country, then overlaps are bits already set by another country
+    country_masks = {}
+    for start, end, country_id in db.session.query(
+            WmiCountryRange.start_index, WmiCountryRange.end_index, WmiCountryRange.country_id):
+        country_masks[country_id] = country_masks.get(country_id, 0) | span_mask(start, end)
+
+    covered = 0
+    overlapping = 0
+    for mask in country_masks.values():
+        overlapping |= covered & mask
+        covered |= mask
+    missing = span_mask(0, total - 1) & ~covered
+
+    names = {}
+    if overlapping:
+        names = dict(db.session.query(Country.id, Country.common_name)
+                     .filter(Country.id.in_(list(country_masks))))
+
+    overlaps = []
+    for start, end in mask_spans(overlapping):
+        span = span_mask(start, end)
+        overlaps.append({
+            'codes': format_span(start, end, 2),
+            'count': end - start + 1,
+            'countries': sorted(names.get(country_id, str(country_id))
+                                for country_id, mask in country_masks.items() if mask & span)
+        })
+
+    empty_ranges = [
+        first_char for i, first_char in enumerate(VIN_CHARACTERS)
+        if missing & span_mask(i * ALPHABET_SIZE, (i + 1) * ALPHABET_SIZE - 1)
+        == span_mask(i * ALPHABET_SIZE, (i + 1) * ALPHABET_SIZE - 1)
+    ]
+
+    return {
+        'total': total,
+        'assigned': covered.bit_count(),
+        'coverage': covered.bit_count() / total,
+        'overlap_count': overlapping.bit_count(),
+        'overlaps': overlaps,
+        'gap_count': missing.bit_count(),
+        'gaps': [format_span(start, end, 2) for start, end in mask_spans(missing)],
+        'empty_ranges': empty_ranges
+    }, covered
+
+
+def check_factory_codes(region_mask, country_mask):
+    """Coverage of the 3-character factory space, plus WMIs with no region/country assignment"""
+    total = space_size(3)
+    counts = bytearray(total)
+    invalid = []
+
+    for (wmi,) in db.session.query(WmiFactoryCode.wmi):
+        index = code_index(wmi) if len(wmi) == 3 else None
+        if index is None:
+            invalid.append(wmi)
+        elif counts[index] < 255:
+            counts[index] += 1
+
+    assigned = total - counts.count(0)
+    duplicates = [index_code(i, 3) for i, count in enumerate(counts) if count > 1]
+
+    # Fold each factory WMI onto its 2- and 1-character prefix bits
+    without_country = []
+    without_region = []
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        if not (country_mask >> (index // ALPHABET_SIZE)) & 1:
+            without_country.append(index_code(index, 3))
+        if not (region_mask >> (index // ALPHABET_SIZE ** 2)) & 1:
+            without_region.append(index_code(index, 3))
+
+    return {
+        'total': total,
+        'assigned': assigned,
+        'coverage': assigned / total,
+        'duplicates': duplicates,
+        'invalid': sorted(invalid),
+        'without_country': without_country,
+        'without_region': without_region
+    }
+
+
+def validate_wmi_codes(strict=False):
     """
-    Validate wmi_country_codes table for overlaps and gaps.
-    Returns True if validation passes (user continues), False otherwise.
+    Check the region, country and factory code tables without prompting.
+    Returns a report dict; report['ok'] is False on errors (country overlaps
+    or gaps, duplicate factory WMIs), or on warnings too when strict.
     """
-    
+    regions, region_mask = check_region_codes()
+    countries, country_mask = check_country_ranges()
+    factories = check_factory_codes(region_mask, country_mask)
+
+    errors = []
+    warnings = []
+    if countries['overlap_count']:
+        errors.append(f"{countries['overlap_count']} country codes are assigned to several countries")
+    if countries['gap_count']:
+        errors.append(f"{countries['gap_count']} country codes are unassigned")
+    if factories['duplicates']:
+        errors.append(f"{len(factories['duplicates'])} factory WMIs appear more than once")
+    if regions['gaps']:
+        warnings.append(f"{len(regions['gaps'])} region code spans are unassigned")
+    if factories['invalid']:
+        warnings.append(f"{len(factories['invalid'])} factory WMIs contain non-VIN characters")
+    if factories['without_country']:
+        warnings.append(f"{len(factories['without_country'])} factory WMIs have no country code")
+    if factories['without_region']:
+        warnings.append(f"{len(factories['without_region'])} factory WMIs have no region code")
+
+    return {
+        'ok': not errors and not (strict and warnings),
+        'errors': errors,
+        'warnings': warnings,
+        'region_codes': regions,
+        'country_codes': countries,
+        'factory_codes': factories
+    }
+
+
+def exit_status(report):
+    """Process exit status for a validation report"""
+    return 0 if report['ok'] else 1
+
+
+def print_validation_report(report):
+    """Print a validation report"""
+    countries = report['country_codes']
+    factories = report['factory_codes']
+    regions = report['region_codes']
+
+    def sample(items):
+        shown = ', '.join(items[:REPORT_SAMPLE_SIZE])
+        if len(items) > REPORT_SAMPLE_SIZE:
+            shown += f" ... and {len(items) - REPORT_SAMPLE_SIZE} more"
+        return shown
+
+    print("\n" + "="*60)
+    print("📋 VALIDATING WMI CODES")
+    print("="*60)
+
+    print(f"\n🌐 Region codes: {regions['assigned']}/{regions['total']} "
+          f"({regions['coverage']*100:.1f}%)")
+    if regions['gaps']:
+        print(f"  ⚠️  Unassigned: {sample(regions['gaps'])}")
+
+    print(f"\n🌍 Country codes: {countries['assigned']}/{countries['total']} "
+          f"({countries['coverage']*100:.1f}%)")
+    if countries['overlaps']:
+        print(f"  ⚠️  {countries['overlap_count']} overlapping codes:")
+        for overlap in countries['overlaps'][:REPORT_SAMPLE_SIZE]:
+            print(f"    {overlap['codes']}: {', '.join(overlap['countries'])}")
+        if len(countries['overlaps']) > REPORT_SAMPLE_SIZE:
+            print(f"    ... and {len(countries['overlaps']) - REPORT_SAMPLE_SIZE} more")
+    else:
+        print("  ✅ No overlaps found!")
+    if countries['gaps']:
+        print(f"  ⚠️  {countries['gap_count']} unassigned codes: {sample(countries['gaps'])}")
+        if countries['empty_ranges']:
+            print(f"  📭 Empty ranges (all codes missing): {', '.join(countries['empty_ranges'])}")
+    else:
+        print("  ✅ No gaps found - all codes are assigned!")
+
+    print(f"\n🏭 Factory codes: {factories['assigned']}/{factories['total']} "
+          f"({factories['coverage']*100:.2f}%)")
+    if factories['duplicates']:
+        print(f"  ⚠️  Duplicate WMIs: {sample(factories['duplicates'])}")
+    if factories['invalid']:
+        print(f"  ⚠️  Non-VIN characters: {sample(factories['invalid'])}")
+    if factories['without_country']:
+        print(f"  ⚠️  No country code: {sample(factories['without_country'])}")
+    if factories['without_region']:
+        print(f"  ⚠️  No region code: {sample(factories['without_region'])}")
+
     print("\n" + "="*60)
-    print("📋 VALIDATING WMI COUNTRY CODES")
+    print("📊 SUMMARY:")
+    for error in report['errors']:
+        print(f"  ❌ {error}")
+    for warning in report['warnings']:
+        print(f"  ⚠️  {warning}")
+    print(f"  {'✅ Validation passed' if report['ok'] else '❌ Validation failed'}")
     print("="*60)
-    
-    try:
-        # Get all codes from the database
-        all_entries = WmiCountryCode.query.all()
-        
-        if not all_entries:
-            print("⚠️  No WMI country codes found in database!")
-            print("\n⏸️  Press ENTER to continue...")
-            input()
-            return True
-        
-        # Track all codes and their assignments
-        code_assignments = {}  # code -> list of countries/regions
-        
-        # Process all entries from database
-        for entry in all_entries:
-            code = entry.code
-            location = entry.country.common_name if entry.country else "Unknown"
-            
-            if code not in code_assignments:
-                code_assignments[code] = []
-            code_assignments[code].append(location)
-        
-        # Check for overlaps
-        print("\n🔍 Checking for overlaps...")
-        overlaps = []
-        for code, locations in code_assignments.items():
-            if len(locations) > 1:
-                overlaps.append((code, locations))
-        
-        if overlaps:
-            print(f"⚠️  Found {len(overlaps)} overlapping codes:")
-            for code, locations in sorted(overlaps)[:15]:  # Show first 15
-                print(f"  {code}: {', '.join(set(locations))}")
-            if len(overlaps) > 15:
-                print(f"  ... and {len(overlaps) - 15} more")
-        else:
-            print("✅ No overlaps found!")
-        
-        # Check for gaps
-        print("\n🔍 Checking for gaps...")
-        all_possible_codes = []
-        for first_char in VIN_CHARACTERS:
-            for second_char in VIN_CHARACTERS:
-                all_possible_codes.append(first_char + second_char)
-        
-        assigned_codes = set(code_assignments.keys())
-        missing_codes = set(all_possible_codes) - assigned_codes
-        
-        empty_ranges = []  # Initialize here
-        
-        if missing_codes:
-            print(f"⚠️  Found {len(missing_codes)} unassigned codes")
-            
-            # Group by first character
-            missing_by_first = {}
-            for code in sorted(missing_codes):
-                first = code[0]
-                if first not in missing_by_first:
-                    missing_by_first[first] = []
-                missing_by_first[first].append(code)
-            
-            print("\n  Missing codes by first character:")
-            partial_ranges = []
-            
-            for first_char in VIN_CHARACTERS:
-                if first_char in missing_by_first:
-                    codes = missing_by_first[first_char]
-                    # Check if entire range is missing
-                    if len(codes) == 34:  # All 34 possible second characters
-                        empty_ranges.append(first_char)
-                    else:
-                        partial_ranges.append((first_char, len(codes)))
-            
-            if empty_ranges:
-                print(f"\n  📭 Empty ranges (all codes missing): {', '.join(empty_ranges)}")
-                print(f"     These ranges have no country assignments in the database.")
-            
-            if partial_ranges:
-                print(f"\n  ⚠️  Partial coverage:")
-                for first_char, count in partial_ranges[:10]:
-                    print(f"    {first_char}: {count} codes missing")
-                if len(partial_ranges) > 10:
-                    print(f"    ... and {len(partial_ranges) - 10} more ranges")
-        else:
-            print("✅ No gaps found - all codes are assigned!")
-        
-        # Summary
-        print("\n" + "="*60)
-        print("📊 SUMMARY:")
-        print(f"  Total codes in database: {len(all_entries)}")
-        print(f"  Total unique codes assigned: {len(assigned_codes)}")
-        print(f"  Total possible codes: {len(all_possible_codes)}")
-        print(f"  Coverage: {len(assigned_codes)/len(all_possible_codes)*100:.1f}%")
-        print(f"  Overlaps: {len(overlaps)}")
-        print(f"  Gaps: {len(missing_codes)}")
-        
-        if empty_ranges:
-            print(f"  Empty ranges: {', '.join(empty_ranges)}")
-        
-        print("="*60)
-        
-        # Pause and ask user to continue
-        print("\n⏸️  Press ENTER to continue with factory code seeding...")
-        input()
-        return True
-        
-    except Exception as e:
-        print(f"❌ Unexpected error during validation: {e}")
-        print("\n⏸️  Press ENTER to continue anyway...")
-        input()
-        return True
\ No newline at end of file
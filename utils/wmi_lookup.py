@@ -0,0 +1,184 @@
+"""
+In-memory WMI lookup tables for the VIN decoder
+Loads region, country, factory and logo data once and serves decodes from dicts
+"""
+from types import MappingProxyType
+from sqlalchemy import text, bindparam, and_, or_
+from sqlalchemy.orm import joinedload
+from models.country import WmiRegionCode, WmiCountryRange, WmiFactoryCode, db
+from .wmi_ranges import RangeTable, code_index
+
+# Prefixes per country range query; each adds a term to one OR chain, and SQLite
+# limits expression depth to 1000
+RANGE_QUERY_CHUNK = 200
+
+# Fields returned when a prefix has no assignment
+UNKNOWN_REGION = MappingProxyType({'region': 'Unknown'})
+UNKNOWN_COUNTRY = MappingProxyType({'country': 'Unknown'})
+UNKNOWN_FACTORY = MappingProxyType({
+    'manufacturer': 'Unknown Manufacturer',
+    'manufacturer_logos': ()
+})
+
+
+def region_fields(country):
+    """Decode fields for a WMI region code entry"""
+    return MappingProxyType({
+        'region': country.region,
+        'region_country': country.common_name,
+        'region_flag': country.flag_emoji
+    })
+
+
+def country_fields(country):
+    """Decode fields for a WMI country code entry"""
+    return MappingProxyType({
+        'country': country.common_name,
+        'country_flag': country.flag_emoji,
+        'country_region': country.region
+    })
+
+
+def factory_fields(factory, logos):
+    """Decode fields for a WMI factory code entry and its logos"""
+    return MappingProxyType({
+        'manufacturer': factory.manufacturer,
+        'factory_country': factory.country.common_name if factory.country else factory.region,
+        'factory_flag': factory.country.flag_emoji if factory.country else '🏭',
+        'manufacturer_logos': tuple(logos)
+    })
+
+
+def build_wmi_info(region, country, factory):
+    """Merge region, country and factory fields into one decode fragment"""
+    info = dict(region)
+    info.update(country)
+    info.update(factory)
+    info['manufacturer_logos'] = list(info['manufacturer_logos'])
+    return info
+
+
+class WmiLookup:
+    """Immutable WMI tables keyed by the 1-, 2- and 3-character VIN prefix"""
+
+    def __init__(self, regions, countries, factories):
+        self.regions = MappingProxyType(regions)
+        self.countries = MappingProxyType(countries)
+        self.factories = MappingProxyType(factories)
+        # Compact array of factory WMIs for O(1) random sampling
+        self.factory_wmis = tuple(sorted(factories))
+
+    def wmi_info(self, wmi):
+        """Return the region, country and manufacturer fields for a WMI"""
+        return build_wmi_info(
+            self.regions.get(wmi[0], UNKNOWN_REGION),
+            self.countries.get(wmi[:2], UNKNOWN_COUNTRY),
+            self.factories.get(wmi, UNKNOWN_FACTORY)
+        )
+
+    def __repr__(self):
+        return (f"<WmiLookup {len(self.regions)} regions, {len(self.countries)} countries, "
+                f"{len(self.factories)} factories>")
+
+
+def load_factory_logos(factory_ids=None, has_logos=None):
+    """
+    Load factory_id -> logo filenames, empty if match_logos.py has not run.
+    Restricted to factory_ids with a single IN (...) query when given.
+    has_logos is whether factory_logos exists, if the caller already knows.
+    """
+    if has_logos is None:
+        has_logos = db.inspect(db.engine).has_table('factory_logos')
+    if not has_logos:
+        return {}
+
+    if factory_ids is None:
+        query = text("""
+            SELECT factory_id, logo_filename
+            FROM factory_logos
+            ORDER BY factory_id, logo_filename
+        """)
+        params = {}
+    else:
+        query = text("""
+            SELECT factory_id, logo_filename
+            FROM factory_logos
+            WHERE factory_id IN :factory_ids
+            ORDER BY factory_id, logo_filename
+        """).bindparams(bindparam('factory_ids', expanding=True))
+        params = {'factory_ids': list(factory_ids)}
+
+    logos = {}
+    for factory_id, logo_filename in db.session.execute(query, params):
+        logos.setdefault(factory_id, []).append(logo_filename)
+    return logos
+
+
+def load_wmi_lookup(wmis=None, has_logos=None):
+    """
+    Load WMI tables from the database into a WmiLookup.
+    By default every row is loaded; passing wmis restricts each table to one
+    query over the distinct 1-, 2- and 3-character prefixes.
+    When a code has several rows, the one the decoder's .first() query
+    returns (lowest country_id) wins. has_logos skips the factory_logos
+    table check when the caller already knows (vin_app caches it per seed).
+    """
+    if wmis is not None:
+        wmis = set(wmis)
+        if not wmis:
+            return WmiLookup({}, {}, {})
+
+    regions = {}
+    entries = (WmiRegionCode.query
+               .options(joinedload(WmiRegionCode.country))
+               .order_by(WmiRegionCode.code, WmiRegionCode.country_id))
+    if wmis is not None:
+        entries = entries.filter(WmiRegionCode.code.in_({wmi[0] for wmi in wmis}))
+    for entry in entries:
+        regions.setdefault(entry.code, region_fields(entry.country))
+
+    # Country ranges are few; resolve them to per-prefix fields in memory
+    query = WmiCountryRange.query.options(joinedload(WmiCountryRange.country))
+    if wmis is None:
+        entries = query.all()
+    else:
+        # Only the ranges containing a requested prefix, looked up one prefix at a time
+        prefixes = {wmi[:2] for wmi in wmis if code_index(wmi[:2]) is not None}
+        indexes = sorted(code_index(prefix) for prefix in prefixes)
+        found = {}
+        for i in range(0, len(indexes), RANGE_QUERY_CHUNK):
+            covers = [
+                and_(WmiCountryRange.start_index <= index, WmiCountryRange.end_index >= index)
+                for index in indexes[i:i + RANGE_QUERY_CHUNK]
+            ]
+            for entry in query.filter(or_(*covers)):
+                found[entry.id] = entry
+        entries = list(found.values())
+    range_countries = {entry.country_id: entry.country for entry in entries}
+    table = RangeTable([(entry.start_index, entry.end_index, entry.country_id) for entry in entries], width=2)
+    if wmis is None:
+        countries = {code: country_fields(range_countries[country_id]) for code, country_id in table.items()}
+    else:
+        countries = {}
+        for prefix in prefixes:
+            country_id = table.find(prefix)
+            if country_id is not None:
+                countries[prefix] = country_fields(range_countries[country_id])
+
+    entries = WmiFactoryCode.query.options(joinedload(WmiFactoryCode.country))
+    if wmis is not None:
+        entries = entries.filter(WmiFactoryCode.wmi.in_(wmis))
+    factory_entries = entries.all()
+
+    if wmis is None:
+        logos = load_factory_logos(has_logos=has_logos)
+    elif factory_entries:
+        logos = load_factory_logos((factory.id for factory in factory_entries), has_logos)
+    else:
+        logos = {}
+
+    factories = {}
+    for factory in factory_entries:
+        factories[factory.wmi] = factory_fields(factory, logos.get(factory.id, ()))
+
+    return WmiLookup(regions, countries, factories)
@@ -0,0 +1,202 @@
+"""
+Interval storage for WMI code assignments
+Codes of one length are numbered in VIN_CHARACTERS order ('AA' = 0, 'AB' = 1,
+..., '00' = 33² - 1), so a range like 'AA-AH' is a single [start, end]
+interval. Lookups bisect sorted interval starts, and overlap/gap detection
+is one sweep over intervals sorted by start.
+"""
+import bisect
+import heapq
+
+from .progress import log, WARNING
+
+# Valid VIN characters in order (excluding I, O, Q)
+VIN_CHARACTERS = [
+    'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'J', 'K', 'L', 'M',
+    'N', 'P', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z',
+    '1', '2', '3', '4', '5', '6', '7', '8', '9', '0'
+]
+
+CHARACTER_INDEX = {char: i for i, char in enumerate(VIN_CHARACTERS)}
+ALPHABET_SIZE = len(VIN_CHARACTERS)
+
+
+def space_size(width):
+    """Number of possible codes of a given length"""
+    return ALPHABET_SIZE ** width
+
+
+def code_index(code):
+    """Position of a code among codes of its length, or None if it has a non-VIN character"""
+    index = 0
+    for char in code:
+        digit = CHARACTER_INDEX.get(char)
+        if digit is None:
+            return None
+        index = index * ALPHABET_SIZE + digit
+    return index
+
+
+def index_code(index, width):
+    """Inverse of code_index"""
+    chars = []
+    for _ in range(width):
+        index, digit = divmod(index, ALPHABET_SIZE)
+        chars.append(VIN_CHARACTERS[digit])
+    return ''.join(reversed(chars))
+
+
+def warn(message, warnings):
+    """Collect message in warnings if given (worker processes), else log it"""
+    if warnings is None:
+        log(WARNING, message)
+    else:
+        warnings.append(message)
+
+
+def parse_code_range(range_str, warnings=None):
+    """
+    Parse a 2-character range string into [(start, end), ...] code intervals.
+    Format problems are appended to warnings if given, else logged.
+    Examples:
+        'AA-AH' -> [('AA', 'AH')]
+        'H' -> [('HA', 'H0')]
+        'PV' -> [('PV', 'PV')]
+        '1, 4, 5' -> [('1A', '10'), ('4A', '40'), ('5A', '50')]
+    """
+    range_str = range_str.strip()
+    intervals = []
+
+    # Handle comma-separated values (e.g., "1, 4, 5")
+    if ',' in range_str:
+        for part in range_str.split(','):
+            intervals.extend(parse_code_range(part, warnings))
+        return intervals
+
+    # Handle range (e.g., "AA-AH"); the first character comes from the start code
+    if '-' in range_str:
+        start, end = [part.strip() for part in range_str.split('-')]
+        if len(start) == 2 and len(end) == 2:
+            if start[1] not in CHARACTER_INDEX or end[1] not in CHARACTER_INDEX:
+                warn(f"⚠ Invalid character in range '{range_str}'", warnings)
+            elif CHARACTER_INDEX[start[1]] <= CHARACTER_INDEX[end[1]]:
+                intervals.append((start, start[0] + end[1]))
+        else:
+            warn(f"⚠ Invalid range format '{range_str}': expected 2-char codes", warnings)
+
+    # Single character - every code starting with it (e.g., "H" -> "HA" to "H0")
+    elif len(range_str) == 1:
+        intervals.append((range_str + VIN_CHARACTERS[0], range_str + VIN_CHARACTERS[-1]))
+
+    # Exact 2-character code (e.g., "PV")
+    elif len(range_str) == 2:
+        intervals.append((range_str, range_str))
+
+    else:
+        warn(f"⚠ Unknown range format: '{range_str}'", warnings)
+
+    return intervals
+
+
+def find_overlaps(intervals):
+    """
+    Sweep (start, end, value) intervals and return the overlapping spans as
+    (start, end, values) with start/end inclusive.
+    """
+    boundaries = sorted({start for start, _, _ in intervals} | {end + 1 for _, end, _ in intervals})
+    by_start = sorted(intervals, key=lambda interval: interval[0])
+    active = []  # heap of (end, value)
+    overlaps = []
+    position = 0
+
+    for i, segment_start in enumerate(boundaries[:-1]):
+        while position < len(by_start) and by_start[position][0] == segment_start:
+            _, end, value = by_start[position]
+            heapq.heappush(active, (end, value))
+            position += 1
+        while active and active[0][0] < segment_start:
+            heapq.heappop(active)
+        values = sorted({value for _, value in active})
+        if len(values) > 1:
+            segment_end = boundaries[i + 1] - 1
+            if overlaps and overlaps[-1][1] == segment_start - 1 and overlaps[-1][2] == values:
+                overlaps[-1] = (overlaps[-1][0], segment_end, values)
+            else:
+                overlaps.append((segment_start, segment_end, values))
+    return overlaps
+
+
+def find_gaps(intervals, size):
+    """Sweep (start, end, ...) intervals and return the uncovered (start, end) spans of [0, size)"""
+    gaps = []
+    covered_to = -1
+    for interval in sorted(intervals, key=lambda interval: interval[0]):
+        start, end = interval[0], interval[1]
+        if start > covered_to + 1:
+            gaps.append((covered_to + 1, start - 1))
+        covered_to = max(covered_to, end)
+    if covered_to < size - 1:
+        gaps.append((covered_to + 1, size - 1))
+    return gaps
+
+
+class RangeTable:
+    """
+    Disjoint sorted intervals mapping code positions to values.
+    Built from possibly overlapping (start, end, value) intervals; where they
+    overlap, the smallest value wins (like .first() on a (code, country_id) index).
+    """
+
+    def __init__(self, intervals, width):
+        self.width = width
+        self.starts = []
+        self.ends = []
+        self.values = []
+
+        boundaries = sorted({start for start, _, _ in intervals} | {end + 1 for _, end, _ in intervals})
+        by_start = sorted(intervals, key=lambda interval: interval[0])
+        active = []  # heap of (value, end)
+        position = 0
+
+        for i, segment_start in enumerate(boundaries[:-1]):
+            while position < len(by_start) and by_start[position][0] == segment_start:
+                _, end, value = by_start[position]
+                heapq.heappush(active, (value, end))
+                position += 1
+            while active and active[0][1] < segment_start:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            value = active[0][0]
+            segment_end = boundaries[i + 1] - 1
+            if self.ends and self.ends[-1] == segment_start - 1 and self.values[-1] == value:
+                self.ends[-1] = segment_end
+            else:
+                self.starts.append(segment_start)
+                self.ends.append(segment_end)
+                self.values.append(value)
+
+    def find(self, code):
+        """Value assigned to a code, or None"""
+        if len(code) != self.width:
+            return None
+        index = code_index(code)
+        if index is None:
+            return None
+        i = bisect.bisect_right(self.starts, index) - 1
+        if i >= 0 and self.ends[i] >= index:
+            return self.values[i]
+        return None
+
+    def items(self):
+        """Yield (code, value) for every covered code, in code order"""
+        for start, end, value in zip(self.starts, self.ends, self.values):
+            for index in range(start, end + 1):
+                yield index_code(index, self.width), value
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f"<RangeTable {len(self.starts)} intervals over {self.width}-character codes>"
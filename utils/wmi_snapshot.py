@@ -0,0 +1,280 @@
+"""
+Compiled binary WMI snapshot
+Packs the region, country, factory and logo tables into one versioned,
+checksummed file that decoders memory-map and query without SQLAlchemy.
+
+Layout (little-endian):
+    header     magic, format version, payload size, SHA-256 of payload
+    payload    directory of section counts/offsets, then the sections:
+      places     (region, name, flag) string refs shared by region/country codes
+      regions    sorted 1-character codes + place index
+      countries  sorted 2-character codes + place index
+      factories  sorted 3-character WMIs + (manufacturer, country, flag, logo start, logo count)
+      logos      string refs, factories point at a contiguous run
+      strings    length-prefixed UTF-8, deduplicated
+Codes are stored as fixed-width UTF-32-BE, so byte order matches code point
+order and WMIs with non-ASCII characters still round-trip.
+"""
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+
+from .wmi_lookup import build_wmi_info, UNKNOWN_REGION, UNKNOWN_COUNTRY, UNKNOWN_FACTORY
+
+SNAPSHOT_MAGIC = b'VINWMI\x00\x00'
+SNAPSHOT_VERSION = 1
+
+HEADER = struct.Struct('<8sII32s')
+DIRECTORY = struct.Struct('<11I')
+PLACE = struct.Struct('<3I')
+CODE_REF = struct.Struct('<I')
+FACTORY = struct.Struct('<5I')
+STRING_LENGTH = struct.Struct('<I')
+
+# String reference for None
+NO_STRING = 0xFFFFFFFF
+
+# Code encoding and bytes per code character
+KEY_ENCODING = 'utf-32-be'
+KEY_CHAR_SIZE = 4
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or of another version"""
+
+
+class _StringPool:
+    """Deduplicating builder for the strings section"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def ref(self, value):
+        if value is None:
+            return NO_STRING
+        offset = self.offsets.get(value)
+        if offset is None:
+            encoded = value.encode('utf-8')
+            offset = len(self.data)
+            self.data += STRING_LENGTH.pack(len(encoded)) + encoded
+            self.offsets[value] = offset
+        return offset
+
+
+def _encode_key(code, width):
+    if len(code) != width:
+        raise ValueError(f"Expected a {width}-character code, got '{code}'")
+    return code.encode(KEY_ENCODING)
+
+
+def compile_wmi_snapshot(lookup, path):
+    """
+    Write a WmiLookup to a snapshot file.
+    The file is written beside the target and renamed into place, so
+    processes that already mapped the old file keep a consistent view.
+    Returns the number of bytes written.
+    """
+    strings = _StringPool()
+    places = []
+    place_index = {}
+
+    def place(region, name, flag):
+        key = (region, name, flag)
+        if key not in place_index:
+            place_index[key] = len(places)
+            places.append(PLACE.pack(strings.ref(region), strings.ref(name), strings.ref(flag)))
+        return place_index[key]
+
+    region_keys = sorted(lookup.regions)
+    region_refs = [
+        place(f['region'], f['region_country'], f['region_flag'])
+        for f in (lookup.regions[code] for code in region_keys)
+    ]
+
+    country_keys = sorted(lookup.countries)
+    country_refs = [
+        place(f['country_region'], f['country'], f['country_flag'])
+        for f in (lookup.countries[code] for code in country_keys)
+    ]
+
+    factory_keys = sorted(lookup.factories)
+    factories = []
+    logos = []
+    for wmi in factory_keys:
+        fields = lookup.factories[wmi]
+        factory_logos = fields['manufacturer_logos']
+        factories.append(FACTORY.pack(
+            strings.ref(fields['manufacturer']),
+            strings.ref(fields['factory_country']),
+            strings.ref(fields['factory_flag']),
+            len(logos),
+            len(factory_logos)
+        ))
+        logos.extend(CODE_REF.pack(strings.ref(logo)) for logo in factory_logos)
+
+    sections = [
+        b''.join(places),
+        b''.join(_encode_key(code, 1) for code in region_keys) + b''.join(CODE_REF.pack(i) for i in region_refs),
+        b''.join(_encode_key(code, 2) for code in country_keys) + b''.join(CODE_REF.pack(i) for i in country_refs),
+        b''.join(_encode_key(wmi, 3) for wmi in factory_keys) + b''.join(factories),
+        b''.join(logos),
+        bytes(strings.data)
+    ]
+
+    offsets = []
+    position = DIRECTORY.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+
+    directory = DIRECTORY.pack(
+        len(places), len(region_keys), len(country_keys), len(factory_keys), len(logos),
+        *offsets
+    )
+    payload = directory + b''.join(sections)
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload), hashlib.sha256(payload).digest())
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return len(header) + len(payload)
+
+
+class _KeyColumn:
+    """Sequence view over fixed-width sorted keys in the mapped file, for bisect"""
+
+    def __init__(self, buffer, offset, width, count):
+        self.buffer = buffer
+        self.offset = offset
+        self.width = width * KEY_CHAR_SIZE
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start = self.offset + index * self.width
+        return self.buffer[start:start + self.width]
+
+    def find(self, code):
+        key = code.encode(KEY_ENCODING)
+        if len(key) != self.width:
+            return None
+        index = bisect.bisect_left(self, key)
+        if index < self.count and self[index] == key:
+            return index
+        return None
+
+
+class WmiSnapshot:
+    """Memory-mapped snapshot with the same wmi_info() interface as WmiLookup"""
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {e}")
+
+        if len(self._map) < HEADER.size + DIRECTORY.size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+
+        magic, version, payload_size, checksum = HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"{path} is not a WMI snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Snapshot {path} has version {version}, expected {SNAPSHOT_VERSION}")
+        if len(self._map) != HEADER.size + payload_size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+
+        base = HEADER.size
+        if verify and hashlib.sha256(memoryview(self._map)[base:]).digest() != checksum:
+            raise SnapshotError(f"Snapshot {path} failed its checksum")
+
+        (n_places, n_regions, n_countries, n_factories, n_logos,
+         places_off, regions_off, countries_off, factories_off, logos_off, strings_off
+         ) = DIRECTORY.unpack_from(self._map, base)
+
+        self._places = base + places_off
+        self._regions = _KeyColumn(self._map, base + regions_off, 1, n_regions)
+        self._region_refs = base + regions_off + n_regions * KEY_CHAR_SIZE
+        self._countries = _KeyColumn(self._map, base + countries_off, 2, n_countries)
+        self._country_refs = base + countries_off + 2 * n_countries * KEY_CHAR_SIZE
+        self._factories = _KeyColumn(self._map, base + factories_off, 3, n_factories)
+        self._factory_records = base + factories_off + 3 * n_factories * KEY_CHAR_SIZE
+        self._logos = base + logos_off
+        self._strings = base + strings_off
+        self._factory_wmis = None
+
+    def _string(self, ref):
+        if ref == NO_STRING:
+            return None
+        start = self._strings + ref
+        (length,) = STRING_LENGTH.unpack_from(self._map, start)
+        start += STRING_LENGTH.size
+        return self._map[start:start + length].decode('utf-8')
+
+    def _place(self, refs_offset, index):
+        (place,) = CODE_REF.unpack_from(self._map, refs_offset + index * CODE_REF.size)
+        return [self._string(ref) for ref in PLACE.unpack_from(self._map, self._places + place * PLACE.size)]
+
+    def region_fields(self, code):
+        index = self._regions.find(code)
+        if index is None:
+            return UNKNOWN_REGION
+        region, name, flag = self._place(self._region_refs, index)
+        return {'region': region, 'region_country': name, 'region_flag': flag}
+
+    def country_fields(self, code):
+        index = self._countries.find(code)
+        if index is None:
+            return UNKNOWN_COUNTRY
+        region, name, flag = self._place(self._country_refs, index)
+        return {'country': name, 'country_flag': flag, 'country_region': region}
+
+    def factory_fields(self, wmi):
+        index = self._factories.find(wmi)
+        if index is None:
+            return UNKNOWN_FACTORY
+        manufacturer, country, flag, logo_start, logo_count = FACTORY.unpack_from(
+            self._map, self._factory_records + index * FACTORY.size
+        )
+        logos = [
+            self._string(CODE_REF.unpack_from(self._map, self._logos + i * CODE_REF.size)[0])
+            for i in range(logo_start, logo_start + logo_count)
+        ]
+        return {
+            'manufacturer': self._string(manufacturer),
+            'factory_country': self._string(country),
+            'factory_flag': self._string(flag),
+            'manufacturer_logos': logos
+        }
+
+    def wmi_info(self, wmi):
+        """Return the region, country and manufacturer fields for a WMI"""
+        return build_wmi_info(
+            self.region_fields(wmi[0]),
+            self.country_fields(wmi[:2]),
+            self.factory_fields(wmi)
+        )
+
+    @property
+    def factory_wmis(self):
+        """Tuple of factory WMIs for random sampling, decoded on first use"""
+        if self._factory_wmis is None:
+            keys = self._factories
+            self._factory_wmis = tuple(keys[i].decode(KEY_ENCODING) for i in range(len(keys)))
+        return self._factory_wmis
+
+    def close(self):
+        self._map.close()
+
+    def __repr__(self):
+        return (f"<WmiSnapshot {self.path}: {len(self._regions)} regions, "
+                f"{len(self._countries)} countries, {len(self._factories)} factories>")
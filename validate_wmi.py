@@ -0,0 +1,31 @@
+"""Validate the seeded WMI tables without prompting
+Checks coverage, overlaps and gaps of the region, country and factory code
+spaces and exits non-zero on failure, for use in automated pipelines:
+    python validate_wmi.py
+    python validate_wmi.py --strict --json > report.json
+"""
+import argparse
+import json
+import sys
+
+from vin_app import app
+from utils.validators import validate_wmi_codes, print_validation_report, exit_status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validate the seeded WMI code tables')
+    parser.add_argument('--strict', action='store_true',
+                        help='Treat warnings (e.g. factory WMIs with non-VIN characters) as failures')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the report as JSON instead of text')
+    args = parser.parse_args()
+
+    with app.app_context():
+        report = validate_wmi_codes(strict=args.strict)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_validation_report(report)
+    sys.exit(exit_status(report))
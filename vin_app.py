@@ -1,12 +1,28 @@
 """Flask VIN Decoder & Generator Application
 Uses the VIN database for accurate decoding"""
 from flask import Flask, render_template, request, jsonify, send_from_directory
-from models.country import db, Country, WmiRegionCode, WmiCountryCode, WmiFactoryCode
+from models.country import db, WmiFactoryCode
+from utils.wmi_lookup import (
+    load_wmi_lookup, build_wmi_info, region_fields, country_fields, factory_fields,
+    UNKNOWN_REGION, UNKNOWN_COUNTRY, UNKNOWN_FACTORY
+)
+from utils.wmi_snapshot import WmiSnapshot
+from utils.lru_cache import LRUCache, MISSING
+from utils.seed_stamp import read_seed_stamp
+from utils.wmi_ranges import code_index
 from sqlalchemy import text
 import random
+import re
+import time
+from collections import namedtuple
 from datetime import datetime
 import os
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch check digits fall back to pure Python
+    np = None
+
 app = Flask(__name__)
 
 # Define the absolute path to the database
@@ -16,8 +32,32 @@ db_path = os.path.join(basedir, 'instance', 'vin.db')
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + db_path
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Serve decodes from preloaded in-memory WMI tables (set VIN_PRELOAD_LOOKUPS=0 to query the DB)
+app.config['WMI_PRELOAD'] = os.environ.get('VIN_PRELOAD_LOOKUPS', '1') != '0'
+
+# Memory-map this snapshot (see build_wmi_snapshot.py) instead of preloading from the DB
+app.config['WMI_SNAPSHOT'] = os.environ.get('VIN_WMI_SNAPSHOT')
+
+# Maximum number of VINs accepted by /api/decode/batch
+app.config['BATCH_DECODE_LIMIT'] = 10000
+
+# Decode result cache (keyed on normalized VIN) and WMI fields cache (keyed on 3-char prefix)
+# A size of 0 disables a tier; the TTL also keeps model years fresh across a year change
+app.config['DECODE_CACHE_SIZE'] = int(os.environ.get('VIN_DECODE_CACHE_SIZE', 10000))
+app.config['DECODE_CACHE_TTL'] = float(os.environ.get('VIN_DECODE_CACHE_TTL', 3600)) or None
+app.config['WMI_CACHE_SIZE'] = int(os.environ.get('VIN_WMI_CACHE_SIZE', 4096))
+
+# Seconds between checks of the seed stamp written by app.py and match_logos.py
+app.config['SEED_CHECK_INTERVAL'] = 1.0
+
+# Browser cache lifetime of content-hashed images (match_logos.py names thumbnails name.<hash>.png)
+app.config['IMMUTABLE_IMAGE_MAX_AGE'] = 365 * 24 * 3600
+
 db.init_app(app)
 
+decode_cache = LRUCache(app.config['DECODE_CACHE_SIZE'], ttl=app.config['DECODE_CACHE_TTL'])
+wmi_cache = LRUCache(app.config['WMI_CACHE_SIZE'])
+
 # VIN Constants
 VIN_LENGTH = 17
 INVALID_CHARS = ['I', 'O', 'Q']
@@ -52,6 +92,57 @@ def validate_check_digit(vin):
     computed = compute_check_digit(vin)
     return vin[8] == computed
 
+# Check digit characters indexed by weighted sum % 11
+CHECK_DIGIT_CHARS = '0123456789X'
+
+if np is not None:
+    # Byte value -> transliteration value (0 for anything not in TRANSLITERATION)
+    TRANSLITERATION_TABLE = np.zeros(256, dtype=np.int64)
+    for char, value in TRANSLITERATION.items():
+        TRANSLITERATION_TABLE[ord(char)] = value
+    WEIGHTS_ARRAY = np.array(WEIGHTS, dtype=np.int64)
+    CHECK_DIGIT_BYTES = np.frombuffer(CHECK_DIGIT_CHARS.encode('ascii'), dtype=np.uint8)
+
+def compute_check_digits(vins):
+    """
+    Compute check digits for a batch of VINs.
+    Returns (check_digits, valid_flags) matching compute_check_digit and
+    validate_check_digit per VIN; NumPy arrays when NumPy is installed,
+    lists otherwise. VINs that are not 17 characters get '' and False.
+    """
+    if np is None:
+        check_digits = []
+        valid_flags = []
+        for vin in vins:
+            if len(vin) != VIN_LENGTH:
+                check_digits.append('')
+                valid_flags.append(False)
+                continue
+            check_digit = compute_check_digit(vin)
+            check_digits.append(check_digit)
+            valid_flags.append(vin[8] == check_digit)
+        return check_digits, valid_flags
+    
+    vins = list(vins)
+    check_digits = np.full(len(vins), '', dtype='<U1')
+    valid_flags = np.zeros(len(vins), dtype=bool)
+    
+    lengths = np.fromiter(map(len, vins), dtype=np.int64, count=len(vins))
+    rows = np.flatnonzero(lengths == VIN_LENGTH)
+    if not len(rows):
+        return check_digits, valid_flags
+    
+    # Fixed-width byte matrix, one VIN per row; non-ASCII characters become '?' (value 0)
+    joined = ''.join(vins[i] for i in rows).encode('ascii', 'replace')
+    matrix = np.frombuffer(joined, dtype=np.uint8).reshape(len(rows), VIN_LENGTH)
+    
+    remainders = (TRANSLITERATION_TABLE[matrix] @ WEIGHTS_ARRAY) % 11
+    digit_bytes = CHECK_DIGIT_BYTES[remainders]
+    
+    check_digits[rows] = digit_bytes.view('S1').astype('<U1')
+    valid_flags[rows] = matrix[:, 8] == digit_bytes
+    return check_digits, valid_flags
+
 def resolve_model_year(char):
     """Resolve model year with 30-year cycle"""
     base_year = MODEL_YEARS.get(char)
@@ -66,38 +157,262 @@ def resolve_model_year(char):
     
     return year if year <= current_year else None
 
-def get_factory_logos(factory_id):
-    """Get all logos for a factory"""
-    query = text("""
-        SELECT logo_filename 
-        FROM factory_logos 
-        WHERE factory_id = :factory_id
-    """)
-    result = db.session.execute(query, {'factory_id': factory_id})
-    logos = [row[0] for row in result.fetchall()]
-    return logos
-
-def decode_vin(vin):
-    """Decode VIN using database"""
-    vin = vin.upper().strip()
+# Row shapes accepted by the region/country/factory field builders
+Place = namedtuple('Place', ['region', 'common_name', 'flag_emoji'])
+FactoryRow = namedtuple('FactoryRow', ['manufacturer', 'region', 'country'])
+
+# Preloaded WMI tables, loaded on first use, and the seed stamp they were loaded at
+_wmi_lookup = None
+_wmi_lookup_stamp = None
+
+# Factory WMIs sampled by generate_vin when preloading is off
+_factory_wmis = None
+
+def open_wmi_lookup():
+    """Map the configured WMI snapshot, or load the tables from the database"""
+    if app.config['WMI_SNAPSHOT']:
+        return WmiSnapshot(app.config['WMI_SNAPSHOT'])
+    return load_wmi_lookup()
+
+def get_wmi_lookup():
+    """Get the preloaded WMI lookup tables, loading them on first use"""
+    global _wmi_lookup, _wmi_lookup_stamp
+    if _wmi_lookup is None:
+        stamp = _seed_stamp
+        _wmi_lookup = open_wmi_lookup()
+        _wmi_lookup_stamp = stamp
+    return _wmi_lookup
+
+def loaded_wmi_lookup():
+    """The WMI lookup tables in memory (possibly from before a reseed), or None"""
+    return _wmi_lookup
+
+def is_wmi_lookup_loaded():
+    """Whether the WMI lookup tables are already in memory"""
+    return _wmi_lookup is not None
+
+def is_wmi_lookup_current():
+    """Whether the WMI lookup tables in memory were loaded at the current seed stamp"""
+    return _wmi_lookup is not None and _wmi_lookup_stamp == _seed_stamp
+
+def install_wmi_lookup(lookup, stamp):
+    """
+    Swap in lookup tables loaded elsewhere (vin_asgi loads them in a worker thread).
+    stamp is the seed stamp read before loading; if the database was reseeded
+    meanwhile the tables stay marked out of date, so the next check reloads them.
+    """
+    global _wmi_lookup, _wmi_lookup_stamp
+    _wmi_lookup = lookup
+    _wmi_lookup_stamp = stamp
+    decode_cache.clear()
+    wmi_cache.clear()
+    return lookup
+
+def reload_wmi_lookup():
+    """Reload the WMI lookup tables, e.g. after app.py reseeds the database"""
+    global _factory_wmis
+    _factory_wmis = None
+    return install_wmi_lookup(open_wmi_lookup(), _seed_stamp)
+
+def get_factory_wmis():
+    """Get the cached tuple of factory WMIs used for random VIN generation"""
+    global _factory_wmis
+    if app.config['WMI_PRELOAD']:
+        return get_wmi_lookup().factory_wmis
+    if _factory_wmis is None:
+        rows = db.session.query(WmiFactoryCode.wmi).order_by(WmiFactoryCode.wmi)
+        _factory_wmis = tuple(row[0] for row in rows)
+    return _factory_wmis
+
+def invalidate_caches(keep_lookup=False):
+    """
+    Drop cached decode results, WMI fields and preloaded tables after a reseed.
+    With keep_lookup the old tables keep serving until install_wmi_lookup
+    replaces them (vin_asgi never leaves the event loop without tables).
+    """
+    global _wmi_lookup, _factory_wmis, _has_factory_logos
+    decode_cache.clear()
+    wmi_cache.clear()
+    if not keep_lookup:
+        _wmi_lookup = None
+    _factory_wmis = None
+    _has_factory_logos = None
+
+def get_cache_stats():
+    """Hit, miss and eviction counters for both cache tiers"""
+    return {
+        'decode': decode_cache.stats(),
+        'wmi': wmi_cache.stats()
+    }
+
+# Seed stamp seen by this process, and when it was last checked
+_seed_stamp = read_seed_stamp(db_path)
+_seed_checked_at = 0.0
+
+def get_seed_stamp():
+    """Seed stamp of the database as last seen by check_for_reseed"""
+    return _seed_stamp
+
+def check_for_reseed(keep_lookup=False):
+    """Invalidate caches if the database was reseeded since the last check"""
+    global _seed_stamp, _seed_checked_at
+    now = time.monotonic()
+    if now - _seed_checked_at < app.config['SEED_CHECK_INTERVAL']:
+        return False
+    _seed_checked_at = now
     
-    # Basic validation
+    stamp = read_seed_stamp(db_path)
+    if stamp == _seed_stamp:
+        return False
+    
+    _seed_stamp = stamp
+    invalidate_caches(keep_lookup)
+    return True
+
+# Separator for logo filenames aggregated by WMI_INFO_QUERY (ASCII unit separator)
+LOGO_SEPARATOR = '\x1f'
+
+# Everything one decode needs, fetched in a single statement. Region and country codes
+# can belong to several countries; like .first() on their (code, country_id) index,
+# the lowest country_id wins. Country codes are stored as [start_index, end_index]
+# ranges over VIN_CHARACTERS order (see utils.wmi_ranges).
+WMI_INFO_SQL = """
+    SELECT
+        rc.id AS region_country_id, rc.region AS region_region,
+        rc.common_name AS region_name, rc.flag_emoji AS region_flag,
+        cc.id AS country_country_id, cc.region AS country_region,
+        cc.common_name AS country_name, cc.flag_emoji AS country_flag,
+        f.id AS factory_id, f.manufacturer, f.region AS factory_region,
+        fc.id AS factory_country_id, fc.region AS factory_country_region,
+        fc.common_name AS factory_country_name, fc.flag_emoji AS factory_country_flag,
+        {logos} AS logos
+    FROM (SELECT 1) AS k
+    LEFT JOIN countries AS rc ON rc.id = (
+        SELECT country_id FROM wmi_region_codes
+        WHERE code = :region_code ORDER BY country_id LIMIT 1
+    )
+    LEFT JOIN countries AS cc ON cc.id = (
+        SELECT country_id FROM wmi_country_ranges
+        WHERE start_index <= :country_index AND end_index >= :country_index
+        ORDER BY country_id LIMIT 1
+    )
+    LEFT JOIN wmi_factory_codes AS f ON f.wmi = :wmi
+    LEFT JOIN countries AS fc ON fc.id = f.country_id
+"""
+
+WMI_INFO_QUERY = text(WMI_INFO_SQL.format(logos="""(
+        SELECT group_concat(logo_filename, char(31)) FROM (
+            SELECT logo_filename FROM factory_logos
+            WHERE factory_id = f.id ORDER BY logo_filename
+        )
+    )"""))
+
+# Used until match_logos.py has created the factory_logos table
+WMI_INFO_QUERY_NO_LOGOS = text(WMI_INFO_SQL.format(logos='NULL'))
+
+# Whether factory_logos exists, checked once per seed
+_has_factory_logos = None
+
+def has_factory_logos():
+    """Check (once per seed) whether match_logos.py has created factory_logos"""
+    global _has_factory_logos
+    if _has_factory_logos is None:
+        _has_factory_logos = db.inspect(db.engine).has_table('factory_logos')
+    return _has_factory_logos
+
+def get_wmi_info_from_db(wmi):
+    """
+    Look up region, country and manufacturer fields for a WMI in the database.
+    Region, country, factory, factory country and logos come back from one
+    joined statement, so there are no lazy relationship loads.
+    """
+    query = WMI_INFO_QUERY if has_factory_logos() else WMI_INFO_QUERY_NO_LOGOS
+    row = db.session.execute(query, {
+        'region_code': wmi[0],
+        'country_index': code_index(wmi[:2]) if len(wmi) >= 2 else None,
+        'wmi': wmi
+    }).one()
+    
+    region = UNKNOWN_REGION
+    if row.region_country_id is not None:
+        region = region_fields(Place(row.region_region, row.region_name, row.region_flag))
+    
+    country = UNKNOWN_COUNTRY
+    if row.country_country_id is not None:
+        country = country_fields(Place(row.country_region, row.country_name, row.country_flag))
+    
+    factory = UNKNOWN_FACTORY
+    if row.factory_id is not None:
+        factory_country = None
+        if row.factory_country_id is not None:
+            factory_country = Place(row.factory_country_region, row.factory_country_name,
+                                    row.factory_country_flag)
+        factory = factory_fields(
+            FactoryRow(row.manufacturer, row.factory_region, factory_country),
+            row.logos.split(LOGO_SEPARATOR) if row.logos else []
+        )
+    
+    return build_wmi_info(region, country, factory)
+
+def get_wmi_info(wmi):
+    """
+    Look up WMI fields from the preloaded tables, or the database if preloading is off.
+    Database lookups go through the WMI cache tier.
+    """
+    if app.config['WMI_PRELOAD']:
+        return get_wmi_lookup().wmi_info(wmi)
+    
+    info = wmi_cache.get(wmi)
+    if info is MISSING:
+        info = get_wmi_info_from_db(wmi)
+        wmi_cache.set(wmi, info)
+    return copy_result(info)
+
+def copy_result(result):
+    """Copy a cached result so callers can't mutate the cache"""
+    result = dict(result)
+    if 'manufacturer_logos' in result:
+        result['manufacturer_logos'] = list(result['manufacturer_logos'])
+    return result
+
+def validate_vin_format(vin):
+    """Check VIN length and characters, returning an error message or None"""
     if len(vin) != VIN_LENGTH:
-        return {'error': f'VIN must be exactly {VIN_LENGTH} characters'}
+        return f'VIN must be exactly {VIN_LENGTH} characters'
     
     for char in INVALID_CHARS:
         if char in vin:
-            return {'error': f'Invalid character "{char}" found'}
+            return f'Invalid character "{char}" found'
+    
+    return None
+
+def decode_vin(vin, lookup=None):
+    """
+    Decode VIN using the WMI lookup tables, or an explicit WmiLookup.
+    Results of default lookups (or the preloaded tables passed in) are
+    served from the decode cache.
+    """
+    vin = vin.upper().strip()
+    
+    if lookup is None or lookup is _wmi_lookup:
+        cached = decode_cache.get(vin)
+        if cached is not MISSING:
+            return copy_result(cached)
+        result = _decode_vin(vin, lookup)
+        decode_cache.set(vin, copy_result(result))
+        return result
+    
+    return _decode_vin(vin, lookup)
+
+def _decode_vin(vin, lookup):
+    """Decode a normalized VIN without consulting the decode cache"""
+    # Basic validation
+    error = validate_vin_format(vin)
+    if error:
+        return {'error': error}
     
     # Extract components
     wmi = vin[:3]
-    country_code = vin[:2]
-    region_code = vin[0]
-    
-    # Look up in database
-    region_entry = WmiRegionCode.query.filter_by(code=region_code).first()
-    country_entry = WmiCountryCode.query.filter_by(code=country_code).first()
-    factory_entry = WmiFactoryCode.query.filter_by(wmi=wmi).first()
     
     # Build response
     result = {
@@ -112,79 +427,116 @@ def decode_vin(vin):
         'serial_number': vin[11:17]
     }
     
-    # Region info
-    if region_entry:
-        result['region'] = region_entry.country.region
-        result['region_country'] = region_entry.country.common_name
-        result['region_flag'] = region_entry.country.flag_emoji
-    else:
-        result['region'] = 'Unknown'
-    
-    # Country info
-    if country_entry:
-        result['country'] = country_entry.country.common_name
-        result['country_flag'] = country_entry.country.flag_emoji
-        result['country_region'] = country_entry.country.region
-    else:
-        result['country'] = 'Unknown'
-    
-    # Factory/Manufacturer info
-    if factory_entry:
-        result['manufacturer'] = factory_entry.manufacturer
-        result['factory_country'] = factory_entry.country.common_name if factory_entry.country else factory_entry.region
-        result['factory_flag'] = factory_entry.country.flag_emoji if factory_entry.country else '🏭'
-        
-        # Get manufacturer logos
-        logos = get_factory_logos(factory_entry.id)
-        result['manufacturer_logos'] = logos if logos else []
-    else:
-        result['manufacturer'] = 'Unknown Manufacturer'
-        result['manufacturer_logos'] = []
+    # Region, country and factory/manufacturer info
+    result.update(lookup.wmi_info(wmi) if lookup else get_wmi_info(wmi))
     
     # Model year
     result['model_year'] = resolve_model_year(vin[9]) or 'Unknown'
     
     return result
 
-def generate_vin():
-    """Generate a random valid VIN"""
-    # Get random factory
-    factories = WmiFactoryCode.query.all()
-    factory = random.choice(factories) if factories else None
+def decode_vins(vins, lookup=None):
+    """
+    Decode a batch of VINs in input order with the same semantics as decode_vin.
+    Cached results are reused; without preloaded tables the remaining distinct
+    WMIs are resolved with one IN (...) query per table.
+    """
+    use_cache = lookup is None or lookup is _wmi_lookup
+    results = [None] * len(vins)
+    misses = []
     
-    wmi = factory.wmi if factory else ''.join(random.choices(VIN_CHARACTERS, k=3))
+    for i, vin in enumerate(vins):
+        if not isinstance(vin, str):
+            results[i] = {'error': 'VIN must be a string'}
+            continue
+        vin = vin.upper().strip()
+        cached = decode_cache.get(vin) if use_cache else MISSING
+        if cached is MISSING:
+            misses.append((i, vin))
+        else:
+            results[i] = copy_result(cached)
     
-    # VDS (positions 3-7)
-    vds = ''.join(random.choices(VIN_CHARACTERS, k=5))
+    if not misses:
+        return results
     
-    # Model year (not in future)
-    current_year = datetime.now().year
-    valid_years = [k for k, v in MODEL_YEARS.items() if resolve_model_year(k)]
-    model_year_char = random.choice(valid_years) if valid_years else 'L'
+    if lookup is None:
+        if app.config['WMI_PRELOAD']:
+            lookup = get_wmi_lookup()
+        else:
+            lookup = load_wmi_lookup({vin[:3] for _, vin in misses if not validate_vin_format(vin)},
+                                     has_factory_logos())
     
-    # Plant code
-    plant_code = random.choice(VIN_CHARACTERS)
+    for i, vin in misses:
+        result = _decode_vin(vin, lookup)
+        if use_cache:
+            decode_cache.set(vin, copy_result(result))
+        results[i] = result
     
-    # Serial number (6 digits)
-    serial = ''.join(random.choices(DIGITS, k=6))
+    return results
+
+def generate_vins(count, seed=None, wmis=None):
+    """
+    Yield count random valid VINs.
+    Factories are sampled from the cached WMI tuple (or the wmis given), so no
+    rows are loaded per VIN. Pass a seed for a reproducible sequence.
+    """
+    rng = random.Random(seed) if seed is not None else random
     
-    # Build VIN with placeholder check digit
-    vin_array = list(wmi + vds + '0' + model_year_char + plant_code + serial)
+    if wmis is None:
+        wmis = get_factory_wmis()
     
-    # Compute and insert check digit
-    check_digit = compute_check_digit(''.join(vin_array))
-    vin_array[8] = check_digit
+    # Model years (not in future)
+    valid_years = [k for k, v in MODEL_YEARS.items() if resolve_model_year(k)] or ['L']
     
-    return ''.join(vin_array)
+    for _ in range(count):
+        # Random factory
+        wmi = rng.choice(wmis) if wmis else ''.join(rng.choices(VIN_CHARACTERS, k=3))
+        
+        # VDS (positions 3-7)
+        vds = ''.join(rng.choices(VIN_CHARACTERS, k=5))
+        
+        model_year_char = rng.choice(valid_years)
+        
+        # Plant code
+        plant_code = rng.choice(VIN_CHARACTERS)
+        
+        # Serial number (6 digits)
+        serial = ''.join(rng.choices(DIGITS, k=6))
+        
+        # Build VIN with placeholder check digit, then insert the computed one
+        vin = wmi + vds + '0' + model_year_char + plant_code + serial
+        yield vin[:8] + compute_check_digit(vin) + vin[9:]
+
+def generate_vin():
+    """Generate a random valid VIN"""
+    return next(generate_vins(1))
+
+@app.before_request
+def reload_after_reseed():
+    check_for_reseed()
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+# name.<12 hex digits>[@2x].png/.webp: the name changes whenever the content does
+HASHED_IMAGE_NAME = re.compile(r'\.[0-9a-f]{12}(@\d+x)?\.(png|webp)$')
+
 @app.route('/img/<path:filename>')
 def serve_image(filename):
-    """Serve images from the img directory"""
-    return send_from_directory('img', filename)
+    """
+    Serve images from the img directory with an ETag (conditional GETs get a 304).
+    Content-hashed files are cached for good; anything else is revalidated.
+    """
+    if HASHED_IMAGE_NAME.search(filename):
+        response = send_from_directory('img', filename, etag=True, conditional=True,
+                                       max_age=app.config['IMMUTABLE_IMAGE_MAX_AGE'])
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response = send_from_directory('img', filename, etag=True, conditional=True, max_age=0)
+        response.cache_control.no_cache = True
+    return response
 
 @app.route('/api/decode', methods=['POST'])
 def api_decode():
@@ -193,11 +545,48 @@ def api_decode():
     result = decode_vin(vin)
     return jsonify(result)
 
+@app.route('/api/decode/batch', methods=['POST'])
+def api_decode_batch():
+    data = request.get_json(silent=True) or {}
+    vins = data.get('vins')
+    
+    if not isinstance(vins, list):
+        return jsonify({'error': 'Request body must contain a "vins" list'}), 400
+    
+    limit = app.config['BATCH_DECODE_LIMIT']
+    if len(vins) > limit:
+        return jsonify({'error': f'At most {limit} VINs can be decoded per request'}), 400
+    
+    return jsonify({'results': decode_vins(vins)})
+
 @app.route('/api/generate', methods=['POST'])
 def api_generate():
-    vin = generate_vin()
-    decoded = decode_vin(vin)
-    return jsonify(decoded)
+    data = request.get_json(silent=True) or {}
+    count = data.get('count', request.args.get('count'))
+    
+    if count is None:
+        vin = generate_vin()
+        decoded = decode_vin(vin)
+        return jsonify(decoded)
+    
+    try:
+        count = int(count)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'count must be an integer'}), 400
+    
+    limit = app.config['BATCH_DECODE_LIMIT']
+    if not 1 <= count <= limit:
+        return jsonify({'error': f'count must be between 1 and {limit}'}), 400
+    
+    vins = list(generate_vins(count))
+    return jsonify({'results': decode_vins(vins)})
+
+@app.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    return jsonify(get_cache_stats())
 
 if __name__ == '__main__':
+    if app.config['WMI_PRELOAD']:
+        with app.app_context():
+            print(f"Loaded {get_wmi_lookup()}")
     app.run(debug=True, port=5000)
\ No newline at end of file
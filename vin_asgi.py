@@ -0,0 +1,231 @@
+"""Async (ASGI) VIN Decoder service
+Serves the same /api/decode, /api/decode/batch and /api/generate contracts
+as vin_app.py from an asyncio event loop, for many concurrent keep-alive
+clients. Decodes run against the preloaded WMI tables (or the mapped
+snapshot), so requests never wait on the database; loading those tables,
+and any database lookups when preloading is off, run in a thread pool.
+
+Run with:
+    uvicorn vin_asgi:app --port 5001
+    python vin_asgi.py
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import vin_app
+from vin_app import app as flask_app
+
+# Threads for database work kept off the event loop
+DB_THREADS = int(os.environ.get('VIN_ASGI_DB_THREADS', 4))
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 4 * 1024 * 1024
+
+db_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix='vin-db')
+
+# Only one reload of the WMI tables runs at a time
+reload_lock = asyncio.Lock()
+
+
+def in_app_context(func, *args):
+    """Run func inside the Flask app context (for SQLAlchemy sessions)"""
+    with flask_app.app_context():
+        return func(*args)
+
+
+async def run_db(func, *args):
+    """Run a database-touching call in the thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, in_app_context, func, *args)
+
+
+async def ensure_tables():
+    """
+    Load (or reload after a reseed) the WMI tables without blocking the loop.
+    Returns the tables the request should decode with, or None when preloading
+    is off. The old tables keep serving while new ones load in the thread pool;
+    they are swapped in with a single assignment, so the loop never loads them.
+    """
+    vin_app.check_for_reseed(keep_lookup=True)
+    if not flask_app.config['WMI_PRELOAD']:
+        return None
+
+    if not vin_app.is_wmi_lookup_current():
+        async with reload_lock:
+            # Another request may have reloaded them while this one waited
+            if not vin_app.is_wmi_lookup_current():
+                stamp = vin_app.get_seed_stamp()
+                lookup = await run_db(vin_app.open_wmi_lookup)
+                vin_app.install_wmi_lookup(lookup, stamp)
+
+    return vin_app.loaded_wmi_lookup()
+
+
+async def decode(vin, lookup):
+    if lookup is not None:
+        return vin_app.decode_vin(vin, lookup=lookup)
+    return await run_db(vin_app.decode_vin, vin)
+
+
+async def decode_many(vins, lookup):
+    if lookup is not None:
+        return vin_app.decode_vins(vins, lookup=lookup)
+    return await run_db(vin_app.decode_vins, vins)
+
+
+async def generate(count, lookup):
+    if lookup is not None:
+        return list(vin_app.generate_vins(count, wmis=lookup.factory_wmis))
+    return await run_db(lambda: list(vin_app.generate_vins(count)))
+
+
+def json_body(data):
+    """Encode like Flask's jsonify: sorted keys, compact, ASCII-safe"""
+    return (json.dumps(data, ensure_ascii=True, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+async def api_decode(data, query, lookup):
+    vin = data.get('vin', '')
+    if not isinstance(vin, str):
+        return 400, {'error': 'vin must be a string'}
+    return 200, await decode(vin, lookup)
+
+
+async def api_decode_batch(data, query, lookup):
+    vins = data.get('vins')
+
+    if not isinstance(vins, list):
+        return 400, {'error': 'Request body must contain a "vins" list'}
+
+    limit = flask_app.config['BATCH_DECODE_LIMIT']
+    if len(vins) > limit:
+        return 400, {'error': f'At most {limit} VINs can be decoded per request'}
+
+    return 200, {'results': await decode_many(vins, lookup)}
+
+
+async def api_generate(data, query, lookup):
+    count = data.get('count', query.get('count'))
+
+    if count is None:
+        vin = (await generate(1, lookup))[0]
+        return 200, await decode(vin, lookup)
+
+    try:
+        count = int(count)
+    except (TypeError, ValueError):
+        return 400, {'error': 'count must be an integer'}
+
+    limit = flask_app.config['BATCH_DECODE_LIMIT']
+    if not 1 <= count <= limit:
+        return 400, {'error': f'count must be between 1 and {limit}'}
+
+    vins = await generate(count, lookup)
+    return 200, {'results': await decode_many(vins, lookup)}
+
+
+async def api_cache_stats(data, query, lookup):
+    return 200, vin_app.get_cache_stats()
+
+
+ROUTES = {
+    '/api/decode': ('POST', api_decode),
+    '/api/decode/batch': ('POST', api_decode_batch),
+    '/api/generate': ('POST', api_generate),
+    '/api/cache/stats': ('GET', api_cache_stats),
+}
+
+
+def parse_query(query_string):
+    """Parse a raw query string into a dict of first values"""
+    return {key: values[0] for key, values in parse_qs(query_string.decode('latin-1')).items()}
+
+
+async def read_body(receive):
+    """Read the full request body, or None if it exceeds MAX_BODY_SIZE"""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_SIZE:
+            return None
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+async def send_json(send, status, data):
+    body = json_body(data)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def handle_http(scope, receive, send):
+    route = ROUTES.get(scope['path'])
+    if route is None:
+        await send_json(send, 404, {'error': 'Not found'})
+        return
+
+    method, handler = route
+    if scope['method'] != method:
+        await send_json(send, 405, {'error': 'Method not allowed'})
+        return
+
+    body = await read_body(receive)
+    if body is None:
+        await send_json(send, 413, {'error': 'Request body too large'})
+        return
+
+    data = {}
+    if body:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            await send_json(send, 400, {'error': 'Request body must be JSON'})
+            return
+        if not isinstance(data, dict):
+            data = {}
+
+    lookup = await ensure_tables()
+    status, result = await handler(data, parse_query(scope.get('query_string', b'')), lookup)
+    await send_json(send, status, result)
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await ensure_tables()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            db_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'http':
+        await handle_http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run('vin_asgi:app', host='127.0.0.1', port=5001)